@@ -0,0 +1,136 @@
+"""
+Multi-threaded stress benchmark of the thread-safe Red Black Tree.
+
+Runs the same mixed read/write workload against `ConcurrentRBTree`, with and without
+batched writes, and against an `RBTree` behind a single global lock, then reports the
+throughput of each. Run from the repository root:
+
+    python -m benchmarks.concurrent_bench --threads 8 --seconds 2
+"""
+import argparse
+import random
+import threading
+import time
+
+from rb_concurrent import ConcurrentRBTree
+from rb_tree import RBTree
+
+
+class GlobalLockTree:
+    """
+    Baseline: an `RBTree` where every operation, read or write, takes one lock.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.lock = threading.Lock()
+
+    def __contains__(self, value):
+        with self.lock:
+            return self.tree.search(value) is not None
+
+    def insert(self, value):
+        """
+        Inserts a value under the global lock.
+
+        :param value: The value to insert.
+        :return: None
+        """
+        with self.lock:
+            self.tree.insert(value)
+
+    def delete(self, value):
+        """
+        Deletes a value under the global lock.
+
+        :param value: The value to delete.
+        :return: None
+        """
+        with self.lock:
+            self.tree.delete(value)
+
+
+def run(container, threads, seconds, key_space, write_ratio, batched):
+    """
+    Hammers a container with random searches, inserts and deletes from many threads.
+
+    :param container: The tree under test.
+    :param threads: Number of worker threads.
+    :param seconds: Duration of the run.
+    :param key_space: Keys are drawn from range(key_space).
+    :param write_ratio: Fraction of operations that are writes.
+    :param batched: Whether writes are queued and flushed in batches.
+    :return: Total number of operations per second.
+    """
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def __worker(index):
+        generator = random.Random(index)
+        done = 0
+        while not stop.is_set():
+            value = generator.randrange(key_space)
+            if generator.random() < write_ratio:
+                insert = generator.random() < 0.5
+                if batched:
+                    if insert:
+                        container.queue_insert(value)
+                    else:
+                        container.queue_delete(value)
+                elif insert:
+                    container.insert(value)
+                else:
+                    container.delete(value)
+            else:
+                _ = value in container
+            done += 1
+        counts[index] = done
+
+    workers = [threading.Thread(target=__worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    if batched:
+        container.flush()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main():
+    """
+    Parses the command line, runs every variant and prints a throughput table.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--size", type=int, default=100_000,
+                        help="number of keys loaded before the run")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    key_space = 2 * args.size
+    variants = [
+        ("global lock", lambda tree: GlobalLockTree(tree), False),
+        ("read-write lock", lambda tree: ConcurrentRBTree(tree), False),
+        ("read-write lock, batched writes",
+         lambda tree: ConcurrentRBTree(tree, batch_size=args.batch_size), True),
+    ]
+    print(f"{args.threads} threads, {args.seconds}s, {args.size} keys, "
+          f"{args.write_ratio:.0%} writes")
+    baseline = None
+    for name, wrap, batched in variants:
+        tree = RBTree.from_sorted(range(0, key_space, 2))
+        throughput = run(wrap(tree), args.threads, args.seconds, key_space,
+                         args.write_ratio, batched)
+        baseline = baseline or throughput
+        print(f"{name:<34} {throughput:>12,.0f} ops/s  {throughput / baseline:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""
+Benchmark suite of the Red Black Tree operations.
+
+Times `insert`, `search`, `successor`-based iteration, `height`, `count_nodes`,
+`is_valid` and `delete` of `RBTree` on several workloads and sizes, next to the same
+work done by the `BPlusTree` engine, with `bisect` on a sorted list and with a `dict`.
+Results are written as JSON, and can be checked against an earlier results file so
+that a slowdown fails the run.
+Run from the repository root:
+
+    python -m benchmarks.rb_bench --sizes 1000 100000 1000000 --output results.json
+    python -m benchmarks.rb_bench --output new.json --baseline results.json --threshold 1.25
+    python -m benchmarks.rb_bench --structures rbtree bplus --sizes 1000000
+"""
+import argparse
+import bisect
+import gc
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+
+from rb_btree import BPlusTree
+from rb_tree import RBTree
+
+WORKLOADS = ("random", "ascending", "descending", "zipfian", "mixed")
+
+# Above this size the sorted list baseline is built in bulk instead of with insort,
+# which would need O(n^2) time
+BISECT_INSERT_LIMIT = 100_000
+
+
+def zipfian(generator, size, count, exponent=1.1):
+    """
+    Draws keys from range(size) following a Zipf distribution, where key k is drawn
+    with probability proportional to 1 / (k + 1) ** exponent.
+
+    :param generator: The random generator.
+    :param size: Number of distinct keys.
+    :param count: Number of keys to draw.
+    :param exponent: The exponent of the distribution. Defaults to 1.1.
+    :return: A list of keys.
+    """
+    weights = itertools.accumulate(1 / (k + 1) ** exponent for k in range(size))
+    return generator.choices(range(size), cum_weights=list(weights), k=count)
+
+
+def make_workload(name, size, seed):
+    """
+    Builds the keys of a workload.
+
+    :param name: One of WORKLOADS.
+    :param size: Number of keys.
+    :param seed: Seed of the random generator.
+    :return: A tuple (keys to insert, keys to search, keys to delete, mixed operations),
+             where mixed operations is a list of (is_write, key) or None.
+    """
+    generator = random.Random(seed)
+    if name == "ascending":
+        keys = list(range(size))
+    elif name == "descending":
+        keys = list(range(size - 1, -1, -1))
+    else:
+        keys = list(range(size))
+        generator.shuffle(keys)
+    lookups = zipfian(generator, size, size) if name == "zipfian" else keys
+    operations = None
+    if name == "mixed":
+        # 90% searches, 10% writes alternating between inserts and deletes
+        operations = [(generator.random() < 0.1, generator.randrange(2 * size))
+                      for _ in range(size)]
+    return keys, lookups, keys, operations
+
+
+def timed(function):
+    """
+    Runs a function once with the garbage collector paused.
+
+    :param function: The function to time.
+    :return: The elapsed time in seconds.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def bench_rbtree(keys, lookups, deletions, operations):
+    """
+    Times every operation of `RBTree` on one workload.
+
+    :return: A dict mapping operation names to (seconds, number of operations).
+    """
+    tree = RBTree()
+    results = {}
+
+    def __insert():
+        for key in keys:
+            tree.insert(key)
+
+    def __search():
+        for key in lookups:
+            tree.search(key)
+
+    def __iterate():
+        node = tree.minimum()
+        while node:
+            node = tree.successor(node)
+
+    def __mixed():
+        for is_write, key in operations:
+            if not is_write:
+                tree.search(key)
+            elif key & 1:
+                tree.insert(key)
+            else:
+                tree.delete(key)
+
+    def __delete():
+        for key in deletions:
+            tree.delete(key)
+
+    results["insert"] = (timed(__insert), len(keys))
+    results["search"] = (timed(__search), len(lookups))
+    results["iterate"] = (timed(__iterate), len(tree))
+    results["height"] = (timed(tree.height), 1)
+    results["count_nodes"] = (timed(tree.count_nodes), 1)
+    results["is_valid"] = (timed(tree.is_valid), 1)
+    if operations is not None:
+        results["mixed"] = (timed(__mixed), len(operations))
+    results["delete"] = (timed(__delete), len(deletions))
+    return results
+
+
+def bench_bplus(keys, lookups, deletions, operations):
+    """
+    Times the same operations on the `BPlusTree` engine, iterating leaf by leaf.
+
+    :return: A dict mapping operation names to (seconds, number of operations).
+    """
+    tree = BPlusTree()
+    results = {}
+
+    def __insert():
+        for key in keys:
+            tree.insert(key)
+
+    def __search():
+        for key in lookups:
+            tree.search(key)
+
+    def __iterate():
+        for _ in tree:
+            pass
+
+    def __mixed():
+        for is_write, key in operations:
+            if not is_write:
+                tree.search(key)
+            elif key & 1:
+                tree.insert(key)
+            else:
+                tree.delete(key)
+
+    def __delete():
+        for key in deletions:
+            tree.delete(key)
+
+    results["insert"] = (timed(__insert), len(keys))
+    results["search"] = (timed(__search), len(lookups))
+    results["iterate"] = (timed(__iterate), len(tree))
+    results["height"] = (timed(tree.height), 1)
+    results["is_valid"] = (timed(tree.is_valid), 1)
+    if operations is not None:
+        results["mixed"] = (timed(__mixed), len(operations))
+    results["delete"] = (timed(__delete), len(deletions))
+    return results
+
+
+def bench_bisect(keys, lookups, deletions, operations):
+    """
+    Times the same work on a sorted list searched with `bisect`.
+
+    :return: A dict mapping operation names to (seconds, number of operations).
+    """
+    items = []
+    results = {}
+
+    def __insert():
+        if len(keys) <= BISECT_INSERT_LIMIT:
+            for key in keys:
+                index = bisect.bisect_left(items, key)
+                if index == len(items) or items[index] != key:
+                    items.insert(index, key)
+        else:
+            items.extend(sorted(set(keys)))
+
+    def __search():
+        for key in lookups:
+            index = bisect.bisect_left(items, key)
+            _ = index < len(items) and items[index] == key
+
+    def __iterate():
+        for _ in items:
+            pass
+
+    def __mixed():
+        for is_write, key in operations:
+            index = bisect.bisect_left(items, key)
+            found = index < len(items) and items[index] == key
+            if not is_write:
+                continue
+            if key & 1 and not found:
+                items.insert(index, key)
+            elif not key & 1 and found:
+                del items[index]
+
+    def __delete():
+        for key in deletions:
+            index = bisect.bisect_left(items, key)
+            if index < len(items) and items[index] == key:
+                del items[index]
+
+    results["insert"] = (timed(__insert), len(keys))
+    results["search"] = (timed(__search), len(lookups))
+    results["iterate"] = (timed(__iterate), len(items))
+    if operations is not None:
+        results["mixed"] = (timed(__mixed), len(operations))
+    if len(keys) <= BISECT_INSERT_LIMIT:
+        results["delete"] = (timed(__delete), len(deletions))
+    return results
+
+
+def bench_dict(keys, lookups, deletions, operations):
+    """
+    Times the same work on an unordered `dict`, as a lower bound for point operations.
+
+    :return: A dict mapping operation names to (seconds, number of operations).
+    """
+    table = {}
+    results = {}
+
+    def __insert():
+        for key in keys:
+            table[key] = None
+
+    def __search():
+        for key in lookups:
+            _ = key in table
+
+    def __iterate():
+        for _ in sorted(table):
+            pass
+
+    def __mixed():
+        for is_write, key in operations:
+            if not is_write:
+                _ = key in table
+            elif key & 1:
+                table[key] = None
+            else:
+                table.pop(key, None)
+
+    def __delete():
+        for key in deletions:
+            table.pop(key, None)
+
+    results["insert"] = (timed(__insert), len(keys))
+    results["search"] = (timed(__search), len(lookups))
+    results["iterate"] = (timed(__iterate), len(table))
+    if operations is not None:
+        results["mixed"] = (timed(__mixed), len(operations))
+    results["delete"] = (timed(__delete), len(deletions))
+    return results
+
+
+STRUCTURES = {"rbtree": bench_rbtree, "bplus": bench_bplus, "bisect": bench_bisect,
+              "dict": bench_dict}
+
+
+def run(sizes, workloads, structures, seed):
+    """
+    Runs every combination of structure, workload and size.
+
+    :return: A list of result records.
+    """
+    records = []
+    for size in sizes:
+        for workload in workloads:
+            keys, lookups, deletions, operations = make_workload(workload, size, seed)
+            for structure in structures:
+                results = STRUCTURES[structure](keys, lookups, deletions, operations)
+                for operation, (seconds, count) in results.items():
+                    records.append({
+                        "structure": structure, "workload": workload, "size": size,
+                        "operation": operation, "seconds": seconds, "count": count,
+                        "ns_per_op": seconds * 1e9 / max(count, 1),
+                    })
+                    print(f"{structure:<7} {workload:<10} {size:>9} {operation:<12} "
+                          f"{seconds * 1e9 / max(count, 1):>12,.0f} ns/op", flush=True)
+    return records
+
+
+def regressions(records, baseline, threshold):
+    """
+    Compares results with an earlier run.
+
+    :param records: Records of this run.
+    :param baseline: Records of the earlier run.
+    :param threshold: Largest accepted ratio of new to old time per operation.
+    :return: A list of messages, one per operation that got slower than allowed.
+    """
+    def __key(record):
+        return record["structure"], record["workload"], record["size"], record["operation"]
+
+    old = {__key(record): record for record in baseline}
+    messages = []
+    for record in records:
+        previous = old.get(__key(record))
+        if previous is None or previous["ns_per_op"] <= 0:
+            continue
+        ratio = record["ns_per_op"] / previous["ns_per_op"]
+        if ratio > threshold:
+            messages.append("{} {} {} {}: {:.0f} -> {:.0f} ns/op ({:.2f}x)".format(
+                *__key(record), previous["ns_per_op"], record["ns_per_op"], ratio))
+    return messages
+
+
+def main():
+    """
+    Parses the command line, runs the benchmarks, writes the results and checks them
+    against the baseline if one was given.
+
+    :return: The exit status: 1 if a regression was found, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="tree sizes, up to 10000000")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument("--structures", nargs="+", choices=list(STRUCTURES),
+                        default=list(STRUCTURES))
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--output", help="file to write the JSON results to")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="largest accepted slowdown against the baseline")
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10_000))
+    records = run(args.sizes, args.workloads, args.structures, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "results": records}, file, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        messages = regressions(records, baseline, args.threshold)
+        for message in messages:
+            print("REGRESSION", message)
+        return 1 if messages else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Sorted Map with range aggregates, based on the Red Black Tree"""
+import operator
+
+from rb_map import MapNode, RBMap
+from rb_tree import RBTree
+
+
+class AggregateNode(MapNode):
+    """
+    Node of an `AggregateMap`. Besides its key and item, it stores `total`, the
+    combination of the items of its whole subtree in key order.
+    """
+    __slots__ = ('total',)
+
+    def __init__(self, value, color='red'):
+        super().__init__(value, color)
+        self.total = None
+
+    def copy(self):
+        node = super().copy()
+        node.total = self.total
+        return node
+
+
+class AggregateMap(RBMap):
+    """
+    Sorted map answering range aggregate queries in O(log n) time.
+
+    The aggregate is a monoid given by an associative `combine` function and its
+    `identity`, such as `operator.add` and 0 for sums, `min` and infinity for minimums,
+    or `max` and minus infinity for maximums. The function does not need to be
+    commutative: items are always combined in the order of their keys.
+
+    Every node keeps the combination of the items of its subtree. It is recomputed by
+    `_refresh` after each rotation, and along the path to the root when an item is
+    stored or a node is removed, so updates stay O(log n). Keys added without an item,
+    by `insert`, `from_sorted`, `from_iterable` or `update`, hold the identity.
+    """
+
+    node_class = AggregateNode
+
+    def __init__(self, combine=operator.add, identity=0, key=None, observer=None):
+        """
+        :param combine: Associative function combining two aggregates. Defaults to
+                        `operator.add`.
+        :param identity: Aggregate of no items, neutral for `combine`. Defaults to 0.
+        :param key: Optional function mapping a key to the value it is ordered by.
+        :param observer: Optional `TreeObserver`, notified with ordering keys.
+        """
+        super().__init__(key, observer)
+        self.combine = combine
+        self.identity = identity
+
+    @classmethod
+    def from_sorted(cls, iterable, observer=None):
+        tree = super().from_sorted(iterable, observer)
+        tree.__fill()
+        return tree
+
+    def __fill(self):
+        """
+        Stores the identity as the item of every key, then recomputes the totals bottom
+        up in O(n) time.
+
+        :return: None
+        """
+
+        def __fill(node):
+            if node is not None:
+                __fill(node.left)
+                __fill(node.right)
+                node.item = self.identity
+                self._refresh(node)
+
+        __fill(self.root)
+
+    def insert(self, value, hint=None):
+        node = super().insert(value, hint)
+        if node.total is None:
+            # A new root is placed without `_insert_node`
+            node.item = node.total = self.identity
+        return node
+
+    def __keys(self, other):
+        """
+        Turns an iterable of ordering keys into a map with the monoid of this map, each
+        key holding the identity. Trees are returned unchanged.
+
+        :param other: An `RBTree`, or any iterable of ordering keys.
+        :return: An `RBTree`.
+        """
+        if isinstance(other, RBTree):
+            return other
+        keys = self.__class__.from_iterable(other)
+        keys.combine, keys.identity = self.combine, self.identity
+        keys.__fill()
+        return keys
+
+    def update(self, other):
+        """
+        Adds every key of another map or iterable, see `RBTree.update`. Keys of an
+        iterable get the identity of this map as their item.
+
+        :param other: An `RBTree`, or any iterable of ordering keys.
+        :return: This map.
+        """
+        return super().update(self.__keys(other))
+
+    def symmetric_difference_update(self, other):
+        """
+        Keeps the keys present in exactly one of the maps, see
+        `RBTree.symmetric_difference_update`. Keys of an iterable get the identity of
+        this map as their item.
+
+        :param other: An `RBTree`, or any iterable of ordering keys.
+        :return: This map.
+        """
+        return super().symmetric_difference_update(self.__keys(other))
+
+    def _refresh(self, node):
+        super()._refresh(node)
+        total = node.item
+        if node.left:
+            total = self.combine(node.left.total, total)
+        if node.right:
+            total = self.combine(total, node.right.total)
+        node.total = total
+
+    def __refresh_path(self, node):
+        """
+        Recomputes the subtree data of a node and all its ancestors, bottom up.
+
+        :param node: The lowest node to refresh, possibly None.
+        :return: None
+        """
+        while node:
+            self._refresh(node)
+            node = node.parent
+
+    def _set_item(self, node, item):
+        super()._set_item(node, item)
+        self.__refresh_path(node)
+
+    def _insert_node(self, old, new):
+        # Until its item is stored, the node holds the identity, neutral for its ancestors
+        new.item = new.total = self.identity
+        return super()._insert_node(old, new)
+
+    def _replace_node(self, node, child):
+        super()._replace_node(node, child)
+        self.__refresh_path(node.parent)
+
+    def _left_rotate(self, node):
+        super()._left_rotate(node)
+        self._refresh(node)
+        self._refresh(node.parent)
+
+    def _right_rotate(self, node):
+        super()._right_rotate(node)
+        self._refresh(node)
+        self._refresh(node.parent)
+
+    def aggregate(self, low=None, high=None):
+        """
+        Combines the items of all keys between `low` and `high`, both included, in key
+        order. Below the node where the searches for both bounds part, every subtree
+        lying wholly within the range contributes its stored total, so at most two
+        paths are walked and the query takes O(log n) time.
+
+        :param low: Smallest key of the range, or None for no lower bound.
+        :param high: Greatest key of the range, or None for no upper bound.
+        :return: The aggregate of the range, or the identity if it holds no key.
+        """
+        low = None if low is None else self._order(low)
+        high = None if high is None else self._order(high)
+        combine = self.combine
+
+        # Find the highest node within the range
+        node = self.root
+        while node:
+            if low is not None and node.value < low:
+                node = node.right
+            elif high is not None and high < node.value:
+                node = node.left
+            else:
+                break
+        if node is None:
+            return self.identity
+
+        # Its left subtree contributes every node not smaller than `low`
+        left = self.identity
+        current = node.left
+        while current:
+            if low is None or not current.value < low:
+                right_total = current.right.total if current.right else self.identity
+                left = combine(combine(current.item, right_total), left)
+                current = current.left
+            else:
+                current = current.right
+
+        # Its right subtree contributes every node not greater than `high`
+        right = self.identity
+        current = node.right
+        while current:
+            if high is None or not high < current.value:
+                left_total = current.left.total if current.left else self.identity
+                right = combine(right, combine(left_total, current.item))
+                current = current.right
+            else:
+                current = current.left
+
+        return combine(combine(left, node.item), right)
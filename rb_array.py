@@ -0,0 +1,469 @@
+"""Array-backed Red Black Tree Implementation"""
+from array import array
+
+# Typecode of the arrays holding the links between nodes
+LINK_TYPECODE = 'i'
+
+# Index of the sentinel standing for every NULL leaf; it is always black
+NIL = 0
+
+
+class ArrayRBTree:
+    """
+    Red Black Tree storing its nodes in preallocated typed arrays instead of `Node`
+    objects.
+
+    A node is an integer index into the parallel arrays `keys`, `left`, `right`,
+    `parent` and `red`. Index 0 is a black sentinel standing for every NULL leaf, so
+    the algorithms need no special cases for missing children. Slots of deleted nodes
+    are kept on a free list, threaded through the `left` array, and reused by later
+    inserts. With 8-byte keys a node takes 21 bytes and no Python objects at all.
+    """
+
+    def __init__(self, typecode='q', capacity=16):
+        """
+        :param typecode: The `array` typecode of the keys, e.g. 'q' for 64-bit ints or
+                         'd' for floats. Defaults to 'q'.
+        :param capacity: The number of nodes to preallocate room for. The arrays grow
+                         automatically when it is exceeded. Defaults to 16.
+        """
+        slots = capacity + 1  # Slot 0 is the NIL sentinel
+        self.keys = array(typecode, bytes(array(typecode).itemsize * slots))
+        self.left = array(LINK_TYPECODE, bytes(array(LINK_TYPECODE).itemsize * slots))
+        self.right = array(LINK_TYPECODE, bytes(array(LINK_TYPECODE).itemsize * slots))
+        self.parent = array(LINK_TYPECODE, bytes(array(LINK_TYPECODE).itemsize * slots))
+        self.red = bytearray(slots)
+        self.root = NIL
+        self.free = NIL  # Head of the list of released slots
+        self.top = 1  # First slot that has never been used
+        self.count = 0
+
+    def __allocate(self, value):
+        """
+        Takes a slot from the free list, or the first never used slot, growing the
+        arrays twofold if all of them are taken, and stores the value in it.
+
+        :param value: The key of the new node.
+        :return: The index of the new node.
+        """
+        if self.free != NIL:
+            node = self.free
+            self.free = self.left[node]
+        else:
+            if self.top == len(self.keys):
+                grow = len(self.keys)
+                self.keys.extend(array(self.keys.typecode, bytes(self.keys.itemsize * grow)))
+                for links in (self.left, self.right, self.parent):
+                    links.extend(array(LINK_TYPECODE, bytes(links.itemsize * grow)))
+                self.red.extend(bytes(grow))
+            node = self.top
+            self.top += 1
+        self.keys[node] = value
+        return node
+
+    def __release(self, node):
+        """
+        Puts the slot of a node removed from the tree on the free list.
+
+        :param node: The index of the removed node.
+        :return: None
+        """
+        self.left[node] = self.free
+        self.free = node
+
+    def __len__(self):
+        """
+        Returns the number of keys stored in the tree.
+
+        :return: The number of nodes in the tree.
+        """
+        return self.count
+
+    def value(self, node):
+        """
+        Returns the key stored in the given node.
+
+        :param node: The index of the node.
+        :return: The key of the node.
+        """
+        return self.keys[node]
+
+    def insert(self, value):
+        """
+        Inserts a new value into the tree, placing it as a red leaf and restoring the
+        red-black tree properties with recoloring and rotations. Values already present
+        in the tree are ignored.
+
+        :param value: The value to be inserted into the tree.
+        :return: None
+        """
+        keys = self.keys
+        parent = NIL
+        current = self.root
+        while current != NIL:
+            parent = current
+            if value == keys[current]:
+                return
+            current = self.left[current] if value < keys[current] else self.right[current]
+
+        new = self.__allocate(value)
+        self.parent[new] = parent
+        self.left[new] = NIL
+        self.right[new] = NIL
+        self.red[new] = 1
+        if parent == NIL:
+            self.root = new
+        elif value < keys[parent]:
+            self.left[parent] = new
+        else:
+            self.right[parent] = new
+        self.count += 1
+        self.__fix_insert(new)
+
+    def __fix_insert(self, node):
+        """
+        Fixes the red-black tree property violations after an insertion, following the
+        same cases as `RBTree`. The black sentinel parent of the root ends the loop.
+
+        :param node: The newly inserted node.
+        :return: None
+        """
+        red, parent, left, right = self.red, self.parent, self.left, self.right
+        while red[parent[node]]:
+            father = parent[node]
+            grandparent = parent[father]
+            if father == left[grandparent]:
+                uncle = right[grandparent]
+                if red[uncle]:  # Case 1
+                    red[father] = 0
+                    red[uncle] = 0
+                    red[grandparent] = 1
+                    node = grandparent
+                else:
+                    if node == right[father]:  # Case 2
+                        node = father
+                        self.__left_rotate(node)
+                        father = parent[node]
+                    red[father] = 0  # Case 3
+                    red[grandparent] = 1
+                    self.__right_rotate(grandparent)
+            else:
+                uncle = left[grandparent]
+                if red[uncle]:  # Case 1
+                    red[father] = 0
+                    red[uncle] = 0
+                    red[grandparent] = 1
+                    node = grandparent
+                else:
+                    if node == left[father]:  # Case 2
+                        node = father
+                        self.__right_rotate(node)
+                        father = parent[node]
+                    red[father] = 0  # Case 3
+                    red[grandparent] = 1
+                    self.__left_rotate(grandparent)
+        red[self.root] = 0
+
+    def delete(self, value):
+        """
+        Deletes a value from the tree. Unlike `RBTree`, a node with two children is
+        replaced by splicing its successor into its place, so the slot of the deleted
+        node is the one released. Values not present in the tree are ignored.
+
+        :param value: The value to be deleted from the tree.
+        :return: None
+        """
+        node = self.search(value)
+        if node is None:
+            return
+
+        left, right, parent, red = self.left, self.right, self.parent, self.red
+        removed_red = red[node]
+        if left[node] == NIL:
+            child = right[node]
+            self.__transplant(node, child)
+        elif right[node] == NIL:
+            child = left[node]
+            self.__transplant(node, child)
+        else:
+            successor = self.minimum(right[node])
+            removed_red = red[successor]
+            child = right[successor]
+            if parent[successor] == node:
+                parent[child] = successor  # Also sets the parent of the sentinel
+            else:
+                self.__transplant(successor, child)
+                right[successor] = right[node]
+                parent[right[successor]] = successor
+            self.__transplant(node, successor)
+            left[successor] = left[node]
+            parent[left[successor]] = successor
+            red[successor] = red[node]
+
+        if not removed_red:
+            self.__fix_delete(child)
+        self.__release(node)
+        self.count -= 1
+
+    def __transplant(self, node, child):
+        """
+        Puts `child` in the place of `node` in the tree. The parent link of `child` is
+        set even if it is the sentinel, which `__fix_delete` relies on.
+
+        :param node: The node being replaced.
+        :param child: The node taking its place.
+        :return: None
+        """
+        father = self.parent[node]
+        if father == NIL:
+            self.root = child
+        elif node == self.left[father]:
+            self.left[father] = child
+        else:
+            self.right[father] = child
+        self.parent[child] = father
+
+    def __fix_delete(self, node):
+        """
+        Fixes the red-black tree properties after removing a black node, following the
+        same cases as `RBTree`.
+
+        :param node: The node that took the place of the removed one, possibly the
+                     sentinel.
+        :return: None
+        """
+        red, parent, left, right = self.red, self.parent, self.left, self.right
+        while node != self.root and not red[node]:
+            father = parent[node]
+            if node == left[father]:
+                sibling = right[father]
+                if red[sibling]:
+                    red[sibling] = 0
+                    red[father] = 1
+                    self.__left_rotate(father)
+                    sibling = right[father]
+                if not red[left[sibling]] and not red[right[sibling]]:
+                    red[sibling] = 1
+                    node = father
+                else:
+                    if not red[right[sibling]]:
+                        red[left[sibling]] = 0
+                        red[sibling] = 1
+                        self.__right_rotate(sibling)
+                        sibling = right[father]
+                    red[sibling] = red[father]
+                    red[father] = 0
+                    red[right[sibling]] = 0
+                    self.__left_rotate(father)
+                    node = self.root
+            else:
+                sibling = left[father]
+                if red[sibling]:
+                    red[sibling] = 0
+                    red[father] = 1
+                    self.__right_rotate(father)
+                    sibling = left[father]
+                if not red[left[sibling]] and not red[right[sibling]]:
+                    red[sibling] = 1
+                    node = father
+                else:
+                    if not red[left[sibling]]:
+                        red[right[sibling]] = 0
+                        red[sibling] = 1
+                        self.__left_rotate(sibling)
+                        sibling = left[father]
+                    red[sibling] = red[father]
+                    red[father] = 0
+                    red[left[sibling]] = 0
+                    self.__right_rotate(father)
+                    node = self.root
+        red[node] = 0
+
+    def __left_rotate(self, node):
+        """
+        Performs a left rotation on the given node, which must have a right child.
+
+        :param node: The node to perform the left rotation on.
+        :return: None
+        """
+        left, right, parent = self.left, self.right, self.parent
+        old_right = right[node]
+        right[node] = left[old_right]
+        if left[old_right] != NIL:
+            parent[left[old_right]] = node
+        parent[old_right] = parent[node]
+        if parent[node] == NIL:
+            self.root = old_right
+        elif node == left[parent[node]]:
+            left[parent[node]] = old_right
+        else:
+            right[parent[node]] = old_right
+        left[old_right] = node
+        parent[node] = old_right
+
+    def __right_rotate(self, node):
+        """
+        Performs a right rotation on the given node, which must have a left child.
+
+        :param node: The node to perform the right rotation on.
+        :return: None
+        """
+        left, right, parent = self.left, self.right, self.parent
+        old_left = left[node]
+        left[node] = right[old_left]
+        if right[old_left] != NIL:
+            parent[right[old_left]] = node
+        parent[old_left] = parent[node]
+        if parent[node] == NIL:
+            self.root = old_left
+        elif node == right[parent[node]]:
+            right[parent[node]] = old_left
+        else:
+            left[parent[node]] = old_left
+        right[old_left] = node
+        parent[node] = old_left
+
+    def search(self, value):
+        """
+        Search the tree for a node with the given value.
+        :param value: Value to be found
+        :return: The index of the node if found, or None if not found.
+        """
+        keys, left, right = self.keys, self.left, self.right
+        current = self.root
+        while current != NIL:
+            key = keys[current]
+            if key == value:
+                return current
+            current = left[current] if value < key else right[current]
+        return None
+
+    def minimum(self, node=None):
+        """
+        Finds the node with the minimum value in the subtree rooted at the given node.
+
+        :param node: The index of the starting node. Defaults to the root.
+        :return: The index of the node holding the minimum value, or None if the tree
+            is empty.
+        """
+        if node is None:
+            node = self.root
+        if node == NIL:
+            return None
+        left = self.left
+        while left[node] != NIL:
+            node = left[node]
+        return node
+
+    def maximum(self, node=None):
+        """
+        Finds the node with the maximum value in the subtree rooted at the given node.
+
+        :param node: The index of the starting node. Defaults to the root.
+        :return: The index of the node holding the maximum value, or None if the tree
+            is empty.
+        """
+        if node is None:
+            node = self.root
+        if node == NIL:
+            return None
+        right = self.right
+        while right[node] != NIL:
+            node = right[node]
+        return node
+
+    def successor(self, node):
+        """
+        Find the node with the smallest value greater than the value of the given node.
+
+        :param node: The index of the node for which the successor is to be found.
+        :return: The index of the successor node if it exists, otherwise None.
+        """
+        if self.right[node] != NIL:
+            return self.minimum(self.right[node])
+        parent = self.parent
+        while parent[node] != NIL and node == self.right[parent[node]]:
+            node = parent[node]
+        return parent[node] if parent[node] != NIL else None
+
+    def predecessor(self, node):
+        """
+        Find the node with the largest value smaller than the value of the given node.
+
+        :param node: The index of the node for which the predecessor is to be found.
+        :return: The index of the predecessor node if it exists, otherwise None.
+        """
+        if self.left[node] != NIL:
+            return self.maximum(self.left[node])
+        parent = self.parent
+        while parent[node] != NIL and node == self.left[parent[node]]:
+            node = parent[node]
+        return parent[node] if parent[node] != NIL else None
+
+    def __iter__(self):
+        """
+        Lazily yields the keys of the tree in ascending order.
+
+        :return: A generator of keys in ascending order.
+        """
+        node = self.minimum()
+        while node is not None:
+            yield self.keys[node]
+            node = self.successor(node)
+
+    def copy(self):
+        """
+        Creates an independent snapshot of the tree. Because the whole tree lives in a
+        handful of flat buffers, this is a plain memory copy of each of them.
+
+        :return: A new `ArrayRBTree` with the same contents and shape.
+        """
+        clone = ArrayRBTree.__new__(ArrayRBTree)
+        clone.keys = array(self.keys.typecode, self.keys)
+        clone.left = array(LINK_TYPECODE, self.left)
+        clone.right = array(LINK_TYPECODE, self.right)
+        clone.parent = array(LINK_TYPECODE, self.parent)
+        clone.red = bytearray(self.red)
+        clone.root = self.root
+        clone.free = self.free
+        clone.top = self.top
+        clone.count = self.count
+        return clone
+
+    def is_valid(self):
+        """
+        Validates whether the current tree satisfies Red-Black Tree properties, the same
+        way `RBTree.is_valid` does.
+        :return: True if valid, False otherwise.
+        """
+
+        def __check_properties(node):
+            """
+            Check the subtree rooted at the given node.
+
+            :param node: The index of the current node to validate.
+
+            Returns:
+                (int, bool): A tuple containing the black height of the subtree
+                and a boolean indicating whether the subtree is valid.
+            """
+            if node == NIL:  # Base case: Every NULL leaf has black height 1
+                return 1, True
+
+            left_black_height, left_valid = __check_properties(self.left[node])
+            right_black_height, right_valid = __check_properties(self.right[node])
+
+            if not left_valid or not right_valid:
+                return 0, False
+            if left_black_height != right_black_height:
+                return 0, False
+            if self.red[node] and (self.red[self.left[node]] or self.red[self.right[node]]):
+                return 0, False
+            return left_black_height + (0 if self.red[node] else 1), True
+
+        # The root must be black, and so must the sentinel
+        if self.red[self.root] or self.red[NIL]:
+            return False
+
+        _, is_valid_tree = __check_properties(self.root)
+        return is_valid_tree
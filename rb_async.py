@@ -0,0 +1,180 @@
+"""Red Black Tree with bulk operations cooperating with an asyncio event loop"""
+import asyncio
+from time import perf_counter
+
+from rb_tree import RBTree
+
+
+class SliceBudget:
+    """
+    Amount of work done between two yields to the event loop: a number of operations,
+    optionally capped by a number of seconds, whichever runs out first.
+    """
+
+    def __init__(self, operations=1000, seconds=None):
+        """
+        :param operations: Operations per slice.
+        :param seconds: Optional wall time per slice. Defaults to None (no time limit).
+        """
+        self.operations = operations
+        self.seconds = seconds
+        self.__spent = 0
+        self.__deadline = None
+
+    async def spend(self, operations=1):
+        """
+        Records finished work and yields to the event loop once the slice is used up.
+
+        :param operations: The number of operations done.
+        :return: True if it yielded, False otherwise.
+        """
+        self.__spent += operations
+        if self.seconds is not None and self.__deadline is None:
+            self.__deadline = perf_counter() + self.seconds
+        if self.__spent < self.operations and \
+                (self.__deadline is None or perf_counter() < self.__deadline):
+            return False
+        await asyncio.sleep(0)
+        self.__spent = 0
+        self.__deadline = None
+        return True
+
+
+class AsyncRBTree(RBTree):
+    """
+    Red Black Tree whose bulk operations run in slices, yielding to the event loop
+    between them, so a large rebuild, mass delete or validation does not stall the
+    other tasks for longer than one slice.
+
+    Every single insert or delete is done entirely between two yields, so other tasks
+    always see a consistent tree and may modify it while a bulk operation is paused.
+    Iteration follows a `Cursor`, which stays valid across such modifications, and
+    validation starts over, a bounded number of times, when the tree changed during a
+    pause, as noticed through the `_insert_node`, `_replace_node` and `_refresh` hooks.
+    """
+
+    def __init__(self, observer=None, operations=1000, seconds=None):
+        """
+        :param observer: Optional `TreeObserver`, see `RBTree`.
+        :param operations: Operations per slice, see `SliceBudget`.
+        :param seconds: Optional wall time per slice, see `SliceBudget`.
+        """
+        super().__init__(observer)
+        self.operations = operations
+        self.seconds = seconds
+        self.__version = 0
+
+    def budget(self):
+        """
+        Creates the budget of one bulk operation from the settings of the tree.
+
+        :return: A new `SliceBudget`.
+        """
+        return SliceBudget(self.operations, self.seconds)
+
+    def _insert_node(self, old, new):
+        self.__version += 1
+        return super()._insert_node(old, new)
+
+    def _replace_node(self, node, child):
+        self.__version += 1
+        super()._replace_node(node, child)
+
+    def _refresh(self, node):
+        self.__version += 1
+        super()._refresh(node)
+
+    def clear(self):
+        self.__version += 1
+        super().clear()
+
+    async def insert_many(self, values):
+        """
+        Inserts values one by one, yielding to the event loop between slices.
+
+        :param values: The values to insert.
+        :return: None
+        """
+        budget = self.budget()
+        for value in values:
+            self.insert(value)
+            await budget.spend()
+
+    async def delete_many(self, values):
+        """
+        Deletes values one by one, yielding to the event loop between slices.
+
+        :param values: The values to delete.
+        :return: None
+        """
+        budget = self.budget()
+        for value in values:
+            self.delete(value)
+            await budget.spend()
+
+    async def __aiter__(self):
+        """
+        Lazily yields the values of the tree in ascending order, yielding to the event
+        loop between slices. Values inserted or deleted meanwhile ahead of the current
+        position are seen or skipped accordingly, and values removed in bulk, as by
+        `clear` or `delete_range`, are skipped as well.
+
+        :return: An asynchronous generator of values in ascending order.
+        """
+        if self.root is None:
+            return
+        budget = self.budget()
+        cursor = self.cursor_at(self.minimum().value)
+        value = cursor.value
+        while value is not None:
+            yield value
+            await budget.spend()
+            value = cursor.next()
+
+    async def validate(self, restarts=3):
+        """
+        Validates the Red-Black Tree properties like `is_valid`, together with the parent
+        links and subtree sizes, with a postorder walk on an explicit stack that yields
+        to the event loop between slices. If the tree changes during a pause, the walk
+        starts over, at most `restarts` times: under steady write traffic it gives up
+        rather than running forever.
+
+        :param restarts: The number of times the walk may start over. Defaults to 3.
+        :return: True if valid, False if not, or None if the tree kept changing and the
+                 result is inconclusive.
+        """
+        budget = self.budget()
+        for _ in range(restarts + 1):
+            version = self.__version
+            if self.root and (self.root.red or self.root.parent is not None):
+                return False
+            stack = [(self.root, False)]
+            heights = []
+            while stack:
+                node, expanded = stack.pop()
+                if node is None:
+                    heights.append(1)
+                    continue
+                if not expanded:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                    continue
+
+                right_height = heights.pop()
+                left_height = heights.pop()
+                size = 1
+                for child in (node.left, node.right):
+                    if child is not None:
+                        if child.parent is not node or (node.red and child.red):
+                            return False
+                        size += child.size
+                if left_height != right_height or node.size != size:
+                    return False
+                heights.append(left_height if node.red else left_height + 1)
+
+                if await budget.spend() and version != self.__version:
+                    break
+            else:
+                return True
+        return None
@@ -0,0 +1,444 @@
+"""B+ Tree with the same interface as the Red Black Tree"""
+from bisect import bisect_left, bisect_right
+
+
+class BPlusLeaf:
+    """
+    Leaf of a `BPlusTree`: a sorted list of values, linked to the neighbouring leaves
+    so that iteration never climbs back up the tree.
+    """
+    __slots__ = ('keys', 'prev', 'next')
+    leaf = True
+
+    def __init__(self, keys=None):
+        self.keys = keys if keys is not None else []
+        self.prev = None
+        self.next = None
+
+
+class BPlusNode:
+    """
+    Inner node of a `BPlusTree`. Every value under `children[i]` is smaller than
+    `keys[i]`, and every value under `children[i + 1]` is greater than or equal to it.
+    """
+    __slots__ = ('keys', 'children')
+    leaf = False
+
+    def __init__(self, keys, children):
+        self.keys = keys
+        self.children = children
+
+
+class BPlusTree:
+    """
+    B+ tree offering the interface of `RBTree` for plain values: insert, delete, search,
+    minimum, maximum, successor, predecessor, iteration and `irange`.
+
+    Each node holds up to `order` sorted keys in a Python list searched with `bisect`,
+    so a search makes one C-level binary search per level instead of one attribute
+    load and comparison per level of a binary tree. With the default order of 64 a
+    tree of 10 million values is 4 levels deep. Values live in the leaves only, which
+    are linked in order, so iteration and range scans read list slices.
+
+    Unlike `RBTree`, which hands out nodes, lookups return values: `search` returns the
+    value found, and `successor`/`predecessor` take a value and return the next one.
+    """
+
+    def __init__(self, order=64):
+        """
+        :param order: Largest number of keys in a node, at least 4. Defaults to 64.
+        :raises ValueError: If the order is too small.
+        """
+        if order < 4:
+            raise ValueError("The order of a B+ tree must be at least 4.")
+        self.order = order
+        self.root = BPlusLeaf()
+        self.count = 0
+
+    @classmethod
+    def from_sorted(cls, iterable, order=64):
+        """
+        Builds a tree from values given in strictly ascending order in O(n) time, by
+        filling the leaves and then every level above them from left to right.
+
+        :param iterable: Values in strictly ascending order.
+        :param order: Largest number of keys in a node. Defaults to 64.
+        :return: A new tree containing all the given values.
+        :raises ValueError: If the values are not in strictly ascending order.
+        """
+        values = list(iterable)
+        for i in range(1, len(values)):
+            if not values[i - 1] < values[i]:
+                raise ValueError("Values must be given in strictly ascending order.")
+        tree = cls(order)
+        tree.count = len(values)
+        if not values:
+            return tree
+
+        # Nodes are filled to about three quarters, leaving room for inserts
+        fill = max(order * 3 // 4, order // 2 + 1)
+        level = [BPlusLeaf(values[low:high])
+                 for low, high in cls.__chunks(len(values), order // 2, order, fill)]
+        for left, right in zip(level, level[1:]):
+            left.next, right.prev = right, left
+        lows = [leaf.keys[0] for leaf in level]
+        while len(level) > 1:
+            chunks = cls.__chunks(len(level), order // 2 + 1, order + 1, fill + 1)
+            lows, level = [lows[low] for low, _ in chunks], \
+                [BPlusNode(lows[low + 1:high], level[low:high]) for low, high in chunks]
+        tree.root = level[0]
+        return tree
+
+    @staticmethod
+    def __chunks(count, least, most, target):
+        """
+        Splits `count` consecutive items into chunks of sizes as even as possible, each
+        of `least` to `most` items, their number chosen to get close to `target` items.
+        A single chunk may be smaller than `least`, as it is the root.
+
+        :param count: The number of items.
+        :param least: The smallest size of a chunk.
+        :param most: The greatest size of a chunk.
+        :param target: The preferred size of a chunk.
+        :return: A list of (start, stop) index pairs.
+        """
+        number = -(-count // target)
+        number = max(-(-count // most), min(number, max(1, count // least)))
+        bounds = [count * i // number for i in range(number + 1)]
+        return list(zip(bounds, bounds[1:]))
+
+    def __len__(self):
+        """
+        Returns the number of values in the tree.
+
+        :return: The number of values.
+        """
+        return self.count
+
+    def __leaf(self, value):
+        """
+        Descends to the leaf where the value is or would be stored.
+
+        :param value: The value to locate.
+        :return: The leaf.
+        """
+        node = self.root
+        while not node.leaf:
+            node = node.children[bisect_right(node.keys, value)]
+        return node
+
+    def search(self, value):
+        """
+        Searches the tree for a value.
+
+        :param value: Value to be found.
+        :return: The stored value equal to it if found, or None if not found.
+        """
+        keys = self.__leaf(value).keys
+        index = bisect_left(keys, value)
+        if index < len(keys) and keys[index] == value:
+            return keys[index]
+        return None
+
+    def __contains__(self, value):
+        """
+        Checks whether the value is present in the tree.
+
+        :param value: The value to look up.
+        :return: True if the value is present, False otherwise.
+        """
+        keys = self.__leaf(value).keys
+        index = bisect_left(keys, value)
+        return index < len(keys) and keys[index] == value
+
+    def insert(self, value):
+        """
+        Inserts a value into the leaf where it belongs. A leaf growing over `order`
+        keys is split in two halves, and the first key of the right half is added to
+        the parent, which may split in turn up to the root. Duplicates are ignored.
+
+        :param value: The value to be inserted into the tree.
+        :return: None
+        """
+        path = []
+        node = self.root
+        while not node.leaf:
+            index = bisect_right(node.keys, value)
+            path.append((node, index))
+            node = node.children[index]
+        keys = node.keys
+        index = bisect_left(keys, value)
+        if index < len(keys) and keys[index] == value:
+            return
+        keys.insert(index, value)
+        self.count += 1
+        if len(keys) <= self.order:
+            return
+
+        # Split the leaf, then every inner node on the path that overflows
+        middle = len(keys) // 2
+        right = BPlusLeaf(keys[middle:])
+        del keys[middle:]
+        right.next, right.prev = node.next, node
+        if node.next is not None:
+            node.next.prev = right
+        node.next = right
+        separator = right.keys[0]
+        while path:
+            parent, index = path.pop()
+            parent.keys.insert(index, separator)
+            parent.children.insert(index + 1, right)
+            if len(parent.keys) <= self.order:
+                return
+            middle = len(parent.keys) // 2
+            separator = parent.keys[middle]
+            right = BPlusNode(parent.keys[middle + 1:], parent.children[middle + 1:])
+            del parent.keys[middle:]
+            del parent.children[middle + 1:]
+            node = parent
+        self.root = BPlusNode([separator], [node, right])
+
+    def delete(self, value):
+        """
+        Deletes a value from its leaf. A node left with fewer than `order // 2` keys
+        borrows one from a sibling having more, or is merged with a sibling, which
+        removes a key from the parent and may propagate up to the root.
+
+        :param value: The value to be deleted from the tree.
+        :return: None
+        """
+        path = []
+        node = self.root
+        while not node.leaf:
+            index = bisect_right(node.keys, value)
+            path.append((node, index))
+            node = node.children[index]
+        keys = node.keys
+        index = bisect_left(keys, value)
+        if index == len(keys) or keys[index] != value:
+            return
+        del keys[index]
+        self.count -= 1
+
+        minimum = self.order // 2
+        while path and len(node.keys) < minimum:
+            parent, index = path.pop()
+            self.__rebalance(parent, index)
+            node = parent
+        if not self.root.leaf and len(self.root.children) == 1:
+            self.root = self.root.children[0]
+
+    def __rebalance(self, parent, index):
+        """
+        Fixes an underflowing child of a node by borrowing a key from a sibling with
+        keys to spare, or else by merging it with a sibling.
+
+        :param parent: The parent of the underflowing node.
+        :param index: The position of the underflowing node among the children.
+        :return: None
+        """
+        node = parent.children[index]
+        left = parent.children[index - 1] if index > 0 else None
+        right = parent.children[index + 1] if index + 1 < len(parent.children) else None
+        minimum = self.order // 2
+
+        if left is not None and len(left.keys) > minimum:
+            if node.leaf:
+                node.keys.insert(0, left.keys.pop())
+                parent.keys[index - 1] = node.keys[0]
+            else:
+                node.keys.insert(0, parent.keys[index - 1])
+                node.children.insert(0, left.children.pop())
+                parent.keys[index - 1] = left.keys.pop()
+        elif right is not None and len(right.keys) > minimum:
+            if node.leaf:
+                node.keys.append(right.keys.pop(0))
+                parent.keys[index] = right.keys[0]
+            else:
+                node.keys.append(parent.keys[index])
+                node.children.append(right.children.pop(0))
+                parent.keys[index] = right.keys.pop(0)
+        else:
+            if left is None:
+                left, node, index = node, right, index + 1
+            # Merge `node` into its left sibling `left`
+            if node.leaf:
+                left.keys.extend(node.keys)
+                left.next = node.next
+                if node.next is not None:
+                    node.next.prev = left
+            else:
+                left.keys.append(parent.keys[index - 1])
+                left.keys.extend(node.keys)
+                left.children.extend(node.children)
+            del parent.keys[index - 1]
+            del parent.children[index]
+
+    def clear(self):
+        """
+        Removes every value from the tree.
+
+        :return: None
+        """
+        self.root = BPlusLeaf()
+        self.count = 0
+
+    def __first_leaf(self):
+        node = self.root
+        while not node.leaf:
+            node = node.children[0]
+        return node
+
+    def __last_leaf(self):
+        node = self.root
+        while not node.leaf:
+            node = node.children[-1]
+        return node
+
+    def minimum(self):
+        """
+        Finds the minimum value of the tree.
+
+        :return: The minimum value, or None if the tree is empty.
+        """
+        keys = self.__first_leaf().keys
+        return keys[0] if keys else None
+
+    def maximum(self):
+        """
+        Finds the maximum value of the tree.
+
+        :return: The maximum value, or None if the tree is empty.
+        """
+        keys = self.__last_leaf().keys
+        return keys[-1] if keys else None
+
+    def successor(self, value):
+        """
+        Finds the smallest value greater than the given one, which need not be present.
+
+        :param value: The value to start from.
+        :return: The next value, or None if there is none.
+        """
+        leaf = self.__leaf(value)
+        index = bisect_right(leaf.keys, value)
+        if index < len(leaf.keys):
+            return leaf.keys[index]
+        leaf = leaf.next
+        return leaf.keys[0] if leaf is not None else None
+
+    def predecessor(self, value):
+        """
+        Finds the greatest value smaller than the given one, which need not be present.
+
+        :param value: The value to start from.
+        :return: The previous value, or None if there is none.
+        """
+        leaf = self.__leaf(value)
+        index = bisect_left(leaf.keys, value)
+        if index > 0:
+            return leaf.keys[index - 1]
+        leaf = leaf.prev
+        return leaf.keys[-1] if leaf is not None else None
+
+    def __iter__(self):
+        """
+        Lazily yields the values of the tree in ascending order, leaf by leaf.
+
+        :return: A generator of values in ascending order.
+        """
+        leaf = self.__first_leaf()
+        while leaf is not None:
+            yield from leaf.keys
+            leaf = leaf.next
+
+    def __reversed__(self):
+        """
+        Lazily yields the values of the tree in descending order, leaf by leaf.
+
+        :return: A generator of values in descending order.
+        """
+        leaf = self.__last_leaf()
+        while leaf is not None:
+            yield from reversed(leaf.keys)
+            leaf = leaf.prev
+
+    def irange(self, low=None, high=None, inclusive=(True, True)):
+        """
+        Lazily yields the values between `low` and `high` in ascending order, with the
+        same arguments as `RBTree.irange`. The first leaf is found with one descent and
+        every leaf is then read as a slice bounded by binary search.
+
+        :param low: Lower bound of the range, or None for no lower bound.
+        :param high: Upper bound of the range, or None for no upper bound.
+        :param inclusive: Pair of flags telling whether the lower and upper bounds
+                          themselves belong to the range. Defaults to (True, True).
+        :return: A generator of values within the range.
+        """
+        include_low, include_high = inclusive
+        if low is None:
+            leaf, start = self.__first_leaf(), 0
+        else:
+            leaf = self.__leaf(low)
+            start = (bisect_left if include_low else bisect_right)(leaf.keys, low)
+        while leaf is not None:
+            keys = leaf.keys
+            if high is None or keys and keys[-1] < high:
+                yield from keys[start:]
+            else:
+                stop = (bisect_right if include_high else bisect_left)(keys, high)
+                yield from keys[start:stop]
+                return
+            leaf, start = leaf.next, 0
+
+    def height(self):
+        """
+        Counts the levels of the tree, leaves included.
+
+        :return: The height of the tree.
+        """
+        height, node = 1, self.root
+        while not node.leaf:
+            height, node = height + 1, node.children[0]
+        return height
+
+    def is_valid(self):
+        """
+        Validates the B+ tree properties: sorted keys within their separators, nodes
+        other than the root filled to at least half, all leaves at the same depth and
+        linked in order, and the value count.
+
+        :return: True if valid, False otherwise.
+        """
+        leaves = []
+
+        def __check(node, low, high, depth):
+            """
+            :return: The depth of the leaves under the node, or -1 if invalid.
+            """
+            keys = node.keys
+            if any(not a < b for a, b in zip(keys, keys[1:])):
+                return -1
+            if keys and ((low is not None and keys[0] < low) or
+                         (high is not None and not keys[-1] < high)):
+                return -1
+            if node is not self.root and not self.order // 2 <= len(keys) <= self.order:
+                return -1
+            if node.leaf:
+                leaves.append(node)
+                return depth
+            if len(node.children) != len(keys) + 1:
+                return -1
+            bounds = [low] + keys + [high]
+            depths = {__check(child, bounds[i], bounds[i + 1], depth + 1)
+                      for i, child in enumerate(node.children)}
+            return depths.pop() if len(depths) == 1 else -1
+
+        if __check(self.root, None, None, 0) < 0:
+            return False
+        for left, right in zip(leaves, leaves[1:]):
+            if left.next is not right or right.prev is not left:
+                return False
+        if leaves[0].prev is not None or leaves[-1].next is not None:
+            return False
+        return sum(len(leaf.keys) for leaf in leaves) == self.count
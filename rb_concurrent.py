@@ -0,0 +1,240 @@
+"""Thread-safe Red Black Tree"""
+import threading
+from contextlib import contextmanager
+
+from rb_tree import RBTree
+
+
+class ReadWriteLock:
+    """
+    Lock letting many readers in at the same time, or a single writer alone.
+
+    Writers are preferred: once a writer is waiting, new readers wait until it is done,
+    so a steady stream of readers cannot starve the writers. The lock is not reentrant.
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writing = False
+        self.__waiting_writers = 0
+
+    def acquire_read(self):
+        """
+        Blocks until no writer holds or waits for the lock, then enters as a reader.
+
+        :return: None
+        """
+        with self.__condition:
+            while self.__writing or self.__waiting_writers:
+                self.__condition.wait()
+            self.__readers += 1
+
+    def release_read(self):
+        """
+        Leaves the lock as a reader, waking up writers if it was the last one.
+
+        :return: None
+        """
+        with self.__condition:
+            self.__readers -= 1
+            if self.__readers == 0:
+                self.__condition.notify_all()
+
+    def acquire_write(self):
+        """
+        Blocks until no reader or writer holds the lock, then enters as the writer.
+
+        :return: None
+        """
+        with self.__condition:
+            self.__waiting_writers += 1
+            while self.__writing or self.__readers:
+                self.__condition.wait()
+            self.__waiting_writers -= 1
+            self.__writing = True
+
+    def release_write(self):
+        """
+        Leaves the lock as the writer, waking up everybody waiting.
+
+        :return: None
+        """
+        with self.__condition:
+            self.__writing = False
+            self.__condition.notify_all()
+
+    @contextmanager
+    def reading(self):
+        """
+        Context manager holding the lock as a reader.
+
+        :return: None
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        """
+        Context manager holding the lock as the writer.
+
+        :return: None
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentRBTree:
+    """
+    Thread-safe wrapper around an `RBTree`.
+
+    Searches and iterations run in parallel under the read side of a `ReadWriteLock`,
+    and every modification holds the write side, so no reader ever sees a half-rotated
+    subtree. Writers may also queue inserts and deletes with `queue_insert` and
+    `queue_delete`; queued operations are applied together by `flush`, under a single
+    write lock, and become visible to readers only then.
+    """
+
+    def __init__(self, tree=None, batch_size=None):
+        """
+        :param tree: The tree to protect. Defaults to a new empty `RBTree`. It must not
+                     be used directly once wrapped.
+        :param batch_size: If given, queuing this many operations flushes the queue
+                           automatically. Defaults to None (flush only on request).
+        """
+        self.tree = tree if tree is not None else RBTree()
+        self.lock = ReadWriteLock()
+        self.batch_size = batch_size
+        self.__pending = []
+        self.__pending_lock = threading.Lock()
+
+    def search(self, value):
+        """
+        Search the tree for a node with the given value, under the read lock. The
+        links of the returned node must not be followed without holding the lock.
+        :param value: Value to be found
+        :return: The node if found, or None if not found.
+        """
+        with self.lock.reading():
+            return self.tree.search(value)
+
+    def __contains__(self, value):
+        """
+        Checks, under the read lock, whether the value is present in the tree.
+
+        :param value: The value to look up.
+        :return: True if the value is present, False otherwise.
+        """
+        with self.lock.reading():
+            return self.tree.search(value) is not None
+
+    def __len__(self):
+        """
+        Returns the number of values in the tree, under the read lock.
+
+        :return: The number of nodes in the tree.
+        """
+        with self.lock.reading():
+            return len(self.tree)
+
+    def __iter__(self):
+        """
+        Iterates over a snapshot of the values in ascending order, copied under the
+        read lock. The lock is released before the first value is returned, so the
+        loop may read or modify the tree; changes are not seen by the iterator.
+
+        :return: An iterator of values in ascending order.
+        """
+        with self.lock.reading():
+            values = list(self.tree)
+        return iter(values)
+
+    def irange(self, low=None, high=None, inclusive=(True, True)):
+        """
+        Iterates over a snapshot of the values between `low` and `high`, see
+        `RBTree.irange`. The snapshot is copied under the read lock as in `__iter__`.
+
+        :param low: Lower bound of the range, or None for no lower bound.
+        :param high: Upper bound of the range, or None for no upper bound.
+        :param inclusive: Pair of flags telling whether the bounds belong to the range.
+        :return: An iterator of values within the range.
+        """
+        with self.lock.reading():
+            values = list(self.tree.irange(low, high, inclusive))
+        return iter(values)
+
+    def insert(self, value):
+        """
+        Inserts a value into the tree at once, under the write lock.
+
+        :param value: The value to be inserted into the tree.
+        :return: None
+        """
+        with self.lock.writing():
+            self.tree.insert(value)
+
+    def delete(self, value):
+        """
+        Deletes a value from the tree at once, under the write lock.
+
+        :param value: The value to be deleted from the tree.
+        :return: None
+        """
+        with self.lock.writing():
+            self.tree.delete(value)
+
+    def queue_insert(self, value):
+        """
+        Queues an insert, to be applied by the next `flush`.
+
+        :param value: The value to be inserted into the tree.
+        :return: None
+        """
+        self.__queue(self.tree.insert, value)
+
+    def queue_delete(self, value):
+        """
+        Queues a delete, to be applied by the next `flush`.
+
+        :param value: The value to be deleted from the tree.
+        :return: None
+        """
+        self.__queue(self.tree.delete, value)
+
+    def __queue(self, operation, value):
+        """
+        Appends an operation to the queue, flushing it if it has reached `batch_size`.
+
+        :param operation: The bound tree method to call.
+        :param value: Its argument.
+        :return: None
+        """
+        with self.__pending_lock:
+            self.__pending.append((operation, value))
+            full = self.batch_size is not None and len(self.__pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        Applies every queued operation, in the order they were queued, under a single
+        write lock.
+
+        :return: The number of operations applied.
+        """
+        if not self.__pending:
+            return 0
+        with self.lock.writing():
+            # Taking the queue under the write lock keeps batches in order
+            with self.__pending_lock:
+                pending, self.__pending = self.__pending, []
+            for operation, value in pending:
+                operation(value)
+        return len(pending)
@@ -0,0 +1,202 @@
+"""Incremental and sampled checking of the Red Black Tree invariants"""
+import random
+import time
+
+from rb_tree import RBTree
+
+
+class InvariantError(AssertionError):
+    """
+    Raised when a red-black tree invariant is found broken.
+
+    :ivar node: The first node found violating an invariant.
+    :ivar path: The values of the nodes from the root down to that node.
+    """
+
+    def __init__(self, message, node, path):
+        super().__init__(f"{message} at node {node.value!r}, path {path!r}")
+        self.node = node
+        self.path = path
+
+
+def _path(node):
+    """
+    Lists the values from the root down to a node, following parent references.
+
+    :param node: The node.
+    :return: A list of values, starting with the value of the root.
+    """
+    values = []
+    while node is not None:
+        values.append(node.value)
+        node = node.parent
+    return values[::-1]
+
+
+def _black_height(node):
+    """
+    Counts the black nodes along the leftmost path of a subtree, NULL leaf included.
+    In a valid tree every path has this many, so it is the black height.
+
+    :param node: The root of the subtree, possibly None.
+    :return: The black height.
+    """
+    height = 1
+    while node is not None:
+        if not node.red:
+            height += 1
+        node = node.left
+    return height
+
+
+def _check_links(node):
+    """
+    Checks the invariants involving a node and its children only: parent references,
+    order of the values, no red child of a red node, and the subtree size.
+
+    :param node: The node to check.
+    :return: A description of the first violation, or None if there is none.
+    """
+    size = 1
+    for child, side in ((node.left, 'left'), (node.right, 'right')):
+        if child is None:
+            continue
+        if child.parent is not node:
+            return f"{side} child does not refer back to its parent"
+        if (child.value < node.value) != (side == 'left') or child.value == node.value:
+            return f"{side} child is out of order"
+        if node.red and child.red:
+            return f"red node has a red {side} child"
+        size += child.size
+    if node.size != size:
+        return f"subtree size is {node.size} instead of {size}"
+    return None
+
+
+def check_path(tree, node):
+    """
+    Checks the invariants around the path from a node up to the root: every node on
+    the path and its children are checked with `_check_links`, and the two subtrees of
+    every node on the path must have the same black height along their leftmost paths.
+    Takes O(log^2 n) time, so it may run after every rebalancing.
+
+    :param tree: The tree.
+    :param node: The lowest node of the path, possibly None.
+    :return: None
+    :raises InvariantError: On the first violation found, going up.
+    """
+    if tree.root is not None and tree.root.red:
+        raise InvariantError("root is red", tree.root, [tree.root.value])
+    while node is not None:
+        for checked in (node, node.left, node.right):
+            if checked is None:
+                continue
+            message = _check_links(checked)
+            if message is not None:
+                raise InvariantError(message, checked, _path(checked))
+        if _black_height(node.left) != _black_height(node.right):
+            raise InvariantError("subtrees have different black heights", node, _path(node))
+        node = node.parent
+
+
+def _check_subtree(node, path, low, high):
+    """
+    Recursively checks every invariant in a subtree, the values staying between the
+    bounds set by its ancestors within the subtree.
+
+    :param node: The root of the subtree, possibly None.
+    :param path: The values from the root of the tree down to the parent of `node`.
+    :param low: Every value must be greater than this one, unless it is None.
+    :param high: Every value must be smaller than this one, unless it is None.
+    :return: The black height of the subtree.
+    :raises InvariantError: On the first violation found, in preorder.
+    """
+    if node is None:
+        return 1
+    path = path + [node.value]
+    if (low is not None and not low < node.value) or \
+            (high is not None and not node.value < high):
+        raise InvariantError("value is out of the range of its subtree", node, path)
+    message = _check_links(node)
+    if message is not None:
+        raise InvariantError(message, node, path)
+    left = _check_subtree(node.left, path, low, node.value)
+    right = _check_subtree(node.right, path, node.value, high)
+    if left != right:
+        raise InvariantError("subtrees have different black heights", node, path)
+    return left + (0 if node.red else 1)
+
+
+def validate_sample(tree, budget=0.001, subtree_size=64, generator=None):
+    """
+    Checks randomly chosen parts of the tree within a time budget, instead of walking
+    the whole tree like `RBTree.is_valid`.
+
+    Each sample descends from the root along a random path until reaching a subtree of
+    at most `subtree_size` nodes, checks that subtree completely and the path above it
+    with `check_path`. At least one sample is taken, then more until the budget is
+    spent, so a steady trickle of calls covers the whole tree over time.
+
+    :param tree: The tree to check.
+    :param budget: Time to spend, in seconds. Defaults to 1 ms.
+    :param subtree_size: Largest size of the subtrees checked completely.
+    :param generator: Random generator to draw the paths from. Defaults to `random`.
+    :return: The number of samples checked.
+    :raises InvariantError: With the first violating node and its path.
+    """
+    generator = generator or random
+    deadline = time.perf_counter() + budget
+    samples = 0
+    while tree.root is not None:
+        node, path = tree.root, []
+        while node.size > subtree_size:
+            child = node.left if generator.random() < 0.5 else node.right
+            if child is None:
+                break
+            path.append(node.value)
+            node = child
+        _check_subtree(node, path, None, None)
+        check_path(tree, node)
+        samples += 1
+        if time.perf_counter() >= deadline:
+            break
+    return samples
+
+
+class CheckedRBTree(RBTree):
+    """
+    Red Black Tree checking its invariants locally after every rebalancing.
+
+    After `_fix_insert` and after a deletion that needed `_fix_delete`, the nodes on the
+    repair path up to the root and their children are checked with `check_path`, in
+    O(log^2 n) time, instead of the O(n) of `is_valid`. This still makes updates about
+    ten times slower, so the class is meant for tests and canary deployments, while
+    `validate_sample` suits production. As with the instrumented tree, the checks exist
+    only in this subclass, so a plain `RBTree` does not pay for them.
+    """
+
+    def __init__(self, observer=None):
+        super().__init__(observer)
+        self.__repaired = None
+
+    def _fix_insert(self, node):
+        super()._fix_insert(node)
+        check_path(self, node)
+
+    def _fix_delete(self, node):
+        super()._fix_delete(node)
+        # The node may still have to be removed, so it is checked once that is done
+        self.__repaired = node
+
+    def delete(self, value):
+        self.__repaired = None
+        super().delete(value)
+        node, self.__repaired = self.__repaired, None
+        if node is None:
+            return
+        parent = node.parent
+        if parent is None and node is not self.root or \
+                parent is not None and node is not parent.left and node is not parent.right:
+            # The node left the tree; its last parent is the bottom of the repair path
+            node = parent
+        check_path(self, node)
@@ -0,0 +1,225 @@
+"""Instrumented Red Black Tree, counting what the balancing code does"""
+import time
+from collections import Counter
+
+from rb_tree import RBTree
+
+# Names of the counters reported by `InstrumentedRBTree.stats`
+COUNTERS = ('comparisons', 'rotations', 'recolourings',
+            'fix_insert_iterations', 'fix_delete_iterations')
+
+
+class InstrumentedRBTree(RBTree):
+    """
+    Red Black Tree counting key comparisons, rotations, recolourings and iterations of
+    the fix-up loops, and timing every insert, delete and search.
+
+    The counting versions of the hot-path methods live only in this subclass, so a plain
+    `RBTree` pays nothing for them: instrumentation is enabled by constructing this class
+    instead. Counts accumulate until `reset_stats` is called.
+
+    Comparisons are those made while descending the tree in `insert`, `delete` and
+    `search` (an equality test and an ordering test per visited node, as in `RBTree`).
+    Recolourings count every assignment of a node's color inside the fix-up loops.
+    Wall times are gathered into histograms whose buckets are powers of two of
+    nanoseconds: a call taking t ns is counted in the smallest bucket b with t < b.
+    """
+
+    def __init__(self, observer=None):
+        super().__init__(observer)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {}
+
+    def reset_stats(self):
+        """
+        Sets every counter back to zero and empties the histograms.
+
+        :return: None
+        """
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {}
+
+    def stats(self):
+        """
+        Takes a snapshot of the counters and histograms, not affected by later calls.
+
+        :return: A dict with one entry per counter name in COUNTERS, an 'operations'
+                 entry mapping 'insert', 'delete' and 'search' to the number of calls,
+                 and a 'histograms' entry mapping the same names to dicts of bucket
+                 upper bounds in nanoseconds to the number of calls in the bucket.
+        """
+        snapshot = dict(self.counters)
+        snapshot['operations'] = {name: sum(histogram.values())
+                                  for name, histogram in self.histograms.items()}
+        snapshot['histograms'] = {name: dict(sorted(histogram.items()))
+                                  for name, histogram in self.histograms.items()}
+        return snapshot
+
+    def __timed(self, name, operation, *args):
+        """
+        Calls an operation and records its wall time in the histogram of its name.
+
+        :param name: The name of the histogram.
+        :param operation: The function to call.
+        :param args: Its arguments.
+        :return: The result of the operation.
+        """
+        start = time.perf_counter_ns()
+        result = operation(*args)
+        elapsed = time.perf_counter_ns() - start
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Counter()
+        histogram[1 << elapsed.bit_length()] += 1
+        return result
+
+    def insert(self, value, hint=None):
+        return self.__timed('insert', super().insert, value, hint)
+
+    def delete(self, value):
+        return self.__timed('delete', super().delete, value)
+
+    def search(self, value):
+        return self.__timed('search', super().search, value)
+
+    def _find(self, value):
+        comparisons = 0
+        current = self.root
+        while current:
+            comparisons += 1
+            if current.value == value:
+                break
+            comparisons += 1
+            current = current.left if value < current.value else current.right
+        self.counters['comparisons'] += comparisons
+        return current
+
+    def _insert_node(self, old, new):
+        comparisons = 0
+        value = new.value
+        while True:
+            comparisons += 2
+            if value == old.value:
+                self.counters['comparisons'] += comparisons - 1
+                return old
+            if value < old.value:
+                if old.left is None:
+                    break
+                old = old.left
+            else:
+                if old.right is None:
+                    break
+                old = old.right
+        self.counters['comparisons'] += comparisons
+        return super()._insert_node(old, new)
+
+    def _fix_insert(self, node):
+        iterations = recolourings = 0
+        while node != self.root and node.parent.red:
+            iterations += 1
+            grandparent = node.grandparent()
+            if node.parent == grandparent.left:
+                uncle = grandparent.right
+                if uncle and uncle.red:  # Case 1
+                    node.parent.red = False
+                    uncle.red = False
+                    grandparent.red = True
+                    recolourings += 3
+                    node = grandparent
+                else:
+                    if node == node.parent.right:  # Case 2
+                        node = node.parent
+                        self._left_rotate(node)
+                    node.parent.red = False  # Case 3
+                    grandparent.red = True
+                    recolourings += 2
+                    self._right_rotate(grandparent)
+            else:
+                uncle = grandparent.left
+                if uncle and uncle.red:  # Case 1
+                    node.parent.red = False
+                    uncle.red = False
+                    grandparent.red = True
+                    recolourings += 3
+                    node = grandparent
+                else:
+                    if node == node.parent.left:  # Case 2
+                        node = node.parent
+                        self._right_rotate(node)
+                    node.parent.red = False  # Case 3
+                    grandparent.red = True
+                    recolourings += 2
+                    self._left_rotate(grandparent)
+        self.root.red = False
+        self.counters['fix_insert_iterations'] += iterations
+        self.counters['recolourings'] += recolourings + 1
+
+    def _fix_delete(self, node):
+        iterations = recolourings = 0
+        while node != self.root and not node.red:
+            if node.parent is None:
+                break
+            iterations += 1
+            if node == node.parent.left:
+                sibling = node.parent.right
+                if sibling.red:
+                    sibling.red = False
+                    node.parent.red = True
+                    recolourings += 2
+                    self._left_rotate(node.parent)
+                    sibling = node.parent.right
+                if (not sibling.left or not sibling.left.red) and \
+                        (not sibling.right or not sibling.right.red):
+                    sibling.red = True
+                    recolourings += 1
+                    node = node.parent
+                else:
+                    if not sibling.right or not sibling.right.red:
+                        sibling.left.red = False
+                        sibling.red = True
+                        recolourings += 2
+                        self._right_rotate(sibling)
+                        sibling = node.parent.right
+                    sibling.red = node.parent.red
+                    node.parent.red = False
+                    sibling.right.red = False
+                    recolourings += 3
+                    self._left_rotate(node.parent)
+                    node = self.root
+            else:
+                sibling = node.parent.left
+                if sibling.red:
+                    sibling.red = False
+                    node.parent.red = True
+                    recolourings += 2
+                    self._right_rotate(node.parent)
+                    sibling = node.parent.left
+                if (not sibling.left or not sibling.left.red) and \
+                        (not sibling.right or not sibling.right.red):
+                    sibling.red = True
+                    recolourings += 1
+                    node = node.parent
+                else:
+                    if not sibling.left or not sibling.left.red:
+                        sibling.right.red = False
+                        sibling.red = True
+                        recolourings += 2
+                        self._left_rotate(sibling)
+                        sibling = node.parent.left
+                    sibling.red = node.parent.red
+                    node.parent.red = False
+                    sibling.left.red = False
+                    recolourings += 3
+                    self._right_rotate(node.parent)
+                    node = self.root
+        node.red = False
+        self.counters['fix_delete_iterations'] += iterations
+        self.counters['recolourings'] += recolourings + 1
+
+    def _left_rotate(self, node):
+        self.counters['rotations'] += 1
+        super()._left_rotate(node)
+
+    def _right_rotate(self, node):
+        self.counters['rotations'] += 1
+        super()._right_rotate(node)
@@ -0,0 +1,166 @@
+"""Interval Tree based on the Red Black Tree"""
+from rb_tree import Node, RBTree
+
+
+class IntervalNode(Node):
+    """
+    Node of an `IntervalTree`. Its value is a (start, end) tuple, and `high` is the
+    greatest end among the intervals of its subtree.
+    """
+    __slots__ = ('high',)
+
+    def __init__(self, value, color='red'):
+        super().__init__(value, color)
+        self.high = value[1]
+
+    def copy(self):
+        node = super().copy()
+        node.high = self.high
+        return node
+
+
+class IntervalTree(RBTree):
+    """
+    Interval tree built on the Red Black Tree.
+
+    Values are closed intervals given as (start, end) tuples with start <= end, ordered
+    by start and then by end. Every node keeps the greatest end of its subtree, which
+    lets overlap queries skip every subtree ending before the queried range. The
+    maximum is recomputed by `_refresh` on the nodes whose children change: after each
+    rotation, and along the path to the root after a removal, while an insert only
+    raises the maxima of its ancestors as far as needed, so updates stay O(log n).
+    """
+
+    node_class = IntervalNode
+
+    @classmethod
+    def from_sorted(cls, iterable, observer=None):
+        tree = super().from_sorted(iterable, observer)
+
+        def __refresh(node):
+            if node is not None:
+                __refresh(node.left)
+                __refresh(node.right)
+                tree._refresh(node)  # pylint: disable=protected-access
+
+        __refresh(tree.root)
+        return tree
+
+    def insert(self, value, hint=None):
+        """
+        Inserts an interval, see `RBTree.insert`.
+
+        :param value: A (start, end) tuple.
+        :param hint: Optional node of this tree to start the search from.
+        :return: The node holding the interval.
+        :raises ValueError: If the interval ends before it starts.
+        """
+        start, end = value
+        if end < start:
+            raise ValueError(f"Interval {value!r} ends before it starts.")
+        return super().insert(value, hint)
+
+    def _refresh(self, node):
+        super()._refresh(node)
+        high = node.value[1]
+        if node.left and high < node.left.high:
+            high = node.left.high
+        if node.right and high < node.right.high:
+            high = node.right.high
+        node.high = high
+
+    def __refresh_path(self, node):
+        """
+        Recomputes the subtree data of a node and all its ancestors, bottom up.
+
+        :param node: The lowest node to refresh, possibly None.
+        :return: None
+        """
+        while node:
+            self._refresh(node)
+            node = node.parent
+
+    def _insert_node(self, old, new):
+        node = super()._insert_node(old, new)
+        if node is new:
+            # A new interval can only raise the greatest ends, up to where they exceed it
+            end = new.high
+            ancestor = new.parent
+            while ancestor and ancestor.high < end:
+                ancestor.high = end
+                ancestor = ancestor.parent
+        return node
+
+    def _replace_node(self, node, child):
+        super()._replace_node(node, child)
+        self.__refresh_path(node.parent)
+
+    def _left_rotate(self, node):
+        super()._left_rotate(node)
+        self._refresh(node)
+        self._refresh(node.parent)
+
+    def _right_rotate(self, node):
+        super()._right_rotate(node)
+        self._refresh(node)
+        self._refresh(node.parent)
+
+    def overlapping(self, low, high):
+        """
+        Lazily yields the intervals overlapping the closed range [low, high], that is
+        those with start <= high and end >= low, in ascending order.
+
+        The walk is an in-order traversal with an explicit stack that skips every
+        subtree whose greatest end is below `low`, and stops at the first interval
+        starting after `high`. Reporting k intervals costs O(log n) when k = 0 and at
+        most O(k log n) otherwise, instead of the O(n) of scanning every node.
+
+        :param low: Start of the queried range.
+        :param high: End of the queried range.
+        :return: A generator of (start, end) tuples.
+        """
+        stack = []
+        node = self.root
+        while True:
+            while node and not node.high < low:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            start, end = node.value
+            if high < start:
+                return
+            if not end < low:
+                yield node.value
+            node = node.right
+
+    def stab(self, point):
+        """
+        Lazily yields the intervals containing a point, in ascending order.
+
+        :param point: The point.
+        :return: A generator of (start, end) tuples.
+        """
+        return self.overlapping(point, point)
+
+    def is_valid(self):
+        """
+        Validates the Red-Black Tree properties and the greatest end kept in every node.
+
+        :return: True if valid, False otherwise.
+        """
+
+        def __check(node):
+            """
+            :param node: Root of the subtree to check, possibly None.
+            :return: A tuple (valid, greatest end of the subtree).
+            """
+            if node is None:
+                return True, None
+            left_valid, left_high = __check(node.left)
+            right_valid, right_high = __check(node.right)
+            high = max(end for end in (node.value[1], left_high, right_high) if end is not None)
+            return left_valid and right_valid and node.high == high, high
+
+        return __check(self.root)[0] and super().is_valid()
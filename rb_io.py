@@ -0,0 +1,235 @@
+"""Binary serialization of the Red Black Tree"""
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from rb_tree import Node, RBTree
+
+# Magic bytes, format version, key typecode, two padding bytes and the number of keys
+HEADER = struct.Struct('<4sBcxxQ')
+MAGIC = b'RBT\x00'
+VERSION = 1
+
+# Typecode written for trees whose keys are pickled instead of stored as an array
+PICKLED = b'p'
+
+# Range of keys stored with the 'q' typecode
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _typecode(values):
+    """
+    Chooses how the keys are stored: as 64-bit ints ('q'), as doubles ('d'), or pickled
+    if they are of any other or of mixed types.
+
+    :param values: The keys of the tree.
+    :return: The typecode as a single byte.
+    """
+    if all(type(value) is int and INT64_MIN <= value <= INT64_MAX for value in values):
+        return b'q'
+    if all(type(value) is float for value in values):
+        return b'd'
+    return PICKLED
+
+
+def _check_plain(cls):
+    """
+    Checks that the nodes of a tree class hold nothing but their values, which is all
+    the format stores.
+
+    :param cls: The class of the tree.
+    :return: None
+    :raises TypeError: If its nodes carry other data, such as the items of a map.
+    """
+    if cls.node_class is not Node:
+        raise TypeError(f"{cls.__name__} nodes carry more than their values, "
+                        "which the red-black tree file format does not store.")
+
+
+def dump(tree, path):
+    """
+    Writes the values of a tree to a file in a compact binary format: a 16-byte header
+    followed by the sorted keys, as a little-endian array of 64-bit ints or doubles when
+    all keys are such, and pickled otherwise. The shape of the tree is not stored,
+    because `load` rebuilds a perfectly balanced tree in linear time.
+
+    :param tree: The tree to save.
+    :param path: The path of the file to write.
+    :return: None
+    :raises TypeError: If the nodes of the tree carry more than their values.
+    """
+    _check_plain(type(tree))
+    values = list(tree)
+    typecode = _typecode(values)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, typecode, len(values)))
+        if typecode == PICKLED:
+            pickle.dump(values, file, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            keys = array(typecode.decode(), values)
+            if sys.byteorder == 'big':
+                keys.byteswap()
+            keys.tofile(file)
+
+
+def _read_header(file):
+    """
+    Reads and checks the header of a file written by `dump`.
+
+    :param file: A binary file positioned at its beginning.
+    :return: A tuple (typecode, count).
+    :raises ValueError: If the file was not written by `dump`.
+    """
+    data = file.read(HEADER.size)
+    if len(data) != HEADER.size:
+        raise ValueError("Not a red-black tree file: header is truncated.")
+    magic, version, typecode, count = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a red-black tree file, or written by another version.")
+    return typecode, count
+
+
+def load(path, cls=RBTree):
+    """
+    Reads a tree written by `dump`. The keys are read in bulk and the tree is built with
+    `from_sorted` in O(n) time, without inserting them one by one.
+
+    :param path: The path of the file to read.
+    :param cls: The class of the tree to build. Defaults to `RBTree`.
+    :return: The new tree.
+    :raises ValueError: If the file was not written by `dump`.
+    :raises TypeError: If the nodes of the class carry more than their values.
+    """
+    _check_plain(cls)
+    with open(path, 'rb') as file:
+        typecode, count = _read_header(file)
+        if typecode == PICKLED:
+            values = pickle.load(file)
+        else:
+            values = array(typecode.decode())
+            values.fromfile(file, count)
+            if sys.byteorder == 'big':
+                values.byteswap()
+    return cls.from_sorted(values)
+
+
+class MappedTree:
+    """
+    Read-only view of a tree file written by `dump`, answering queries straight from
+    the memory-mapped sorted key array, without building any nodes.
+
+    Opening is O(1) whatever the size of the file, and pages are read from disk only
+    when a query touches them. Lookups use binary search, so they take O(log n) time
+    like in the tree. Only files with int or float keys can be mapped.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of a file written by `dump`.
+        :raises ValueError: If the file was not written by `dump` or has pickled keys.
+        """
+        with open(path, 'rb') as file:
+            typecode, count = _read_header(file)
+            if typecode == PICKLED:
+                raise ValueError("Only files with int or float keys can be memory-mapped.")
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) \
+                if count else None
+        if count == 0:
+            self.keys = array(typecode.decode())
+        elif sys.byteorder == 'big':
+            self.keys = array(typecode.decode(), self.__map[HEADER.size:])
+            self.keys.byteswap()
+        else:
+            self.keys = memoryview(self.__map)[HEADER.size:].cast(typecode.decode())
+
+    def close(self):
+        """
+        Releases the mapping. The view cannot be used afterwards.
+
+        :return: None
+        """
+        if isinstance(self.keys, memoryview):
+            self.keys.release()
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """
+        Returns the number of keys in the file.
+
+        :return: The number of keys.
+        """
+        return len(self.keys)
+
+    def search(self, value):
+        """
+        Finds the position of a value among the sorted keys.
+
+        :param value: Value to be found.
+        :return: The zero-based rank of the value if found, or None if not found.
+        """
+        index = bisect_left(self.keys, value)
+        if index < len(self.keys) and self.keys[index] == value:
+            return index
+        return None
+
+    def __contains__(self, value):
+        """
+        Checks whether the value is present.
+
+        :param value: The value to look up.
+        :return: True if the value is present, False otherwise.
+        """
+        return self.search(value) is not None
+
+    def minimum(self):
+        """
+        Returns the smallest key.
+
+        :return: The minimum value, or None if there are no keys.
+        """
+        return self.keys[0] if len(self.keys) else None
+
+    def maximum(self):
+        """
+        Returns the greatest key.
+
+        :return: The maximum value, or None if there are no keys.
+        """
+        return self.keys[-1] if len(self.keys) else None
+
+    def __iter__(self):
+        """
+        Yields the keys in ascending order.
+
+        :return: An iterator over the keys.
+        """
+        return iter(self.keys)
+
+    def irange(self, low=None, high=None, inclusive=(True, True)):
+        """
+        Lazily yields the keys between `low` and `high`, with the same arguments as
+        `RBTree.irange`. Both ends are found by binary search.
+
+        :param low: Lower bound of the range, or None for no lower bound.
+        :param high: Upper bound of the range, or None for no upper bound.
+        :param inclusive: Pair of flags telling whether the bounds belong to the range.
+        :return: A generator of keys within the range.
+        """
+        include_low, include_high = inclusive
+        start = 0 if low is None else \
+            (bisect_left if include_low else bisect_right)(self.keys, low)
+        stop = len(self.keys) if high is None else \
+            (bisect_right if include_high else bisect_left)(self.keys, high)
+        for index in range(start, stop):
+            yield self.keys[index]
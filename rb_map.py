@@ -0,0 +1,222 @@
+"""Sorted Map based on the Red Black Tree"""
+from rb_tree import Node, RBTree
+
+# Marker telling that no default was passed to `RBMap.pop`
+_MISSING = object()
+
+
+class MapNode(Node):
+    """
+    Node of an `RBMap`. Besides the ordering key kept in `value`, it stores the key as
+    given by the user and the item associated with it.
+    """
+    __slots__ = ('key', 'item')
+
+    def __init__(self, value, color='red'):
+        super().__init__(value, color)
+        self.key = value
+        self.item = None
+
+    def copy(self):
+        node = super().copy()
+        node.key = self.key
+        node.item = self.item
+        return node
+
+
+class RBMap(RBTree):
+    """
+    Sorted dictionary built on the Red Black Tree.
+
+    Entries are kept in the order of their keys, or of `key(k)` if a key function is
+    given. The key function is applied once per lookup or insert, and the resulting
+    ordering key is cached in the node, so comparisons inside the tree never call it.
+    """
+
+    node_class = MapNode
+
+    def __init__(self, key=None, observer=None):
+        """
+        :param key: Optional function mapping a key to the value it is ordered by.
+                    Defaults to None, which orders by the keys themselves.
+        :param observer: Optional `TreeObserver`, notified with ordering keys.
+        """
+        super().__init__(observer)
+        self.key = key
+
+    def _order(self, key):
+        """
+        Computes the value a key is ordered by.
+
+        :param key: A key of the map.
+        :return: The ordering key.
+        """
+        return key if self.key is None else self.key(key)
+
+    def _set_item(self, node, item):
+        """
+        Stores an item in a node. Every item is stored through this method, so that
+        subclasses can maintain data derived from the items.
+
+        :param node: The node of the key.
+        :param item: The item to store.
+        :return: None
+        """
+        node.item = item
+
+    def __setitem__(self, key, item):
+        """
+        Associates the item with the key. If the key is already present, its item is
+        replaced in place without changing the tree.
+
+        :param key: The key.
+        :param item: The item to store.
+        :return: None
+        """
+        size = len(self)
+        node = self.insert(self._order(key))
+        if len(self) != size:
+            node.key = key
+        self._set_item(node, item)
+
+    def __getitem__(self, key):
+        """
+        Returns the item associated with the key.
+
+        :param key: The key to look up.
+        :return: The item associated with the key.
+        :raises KeyError: If the key is not present.
+        """
+        node = self.search(self._order(key))
+        if node is None:
+            raise KeyError(key)
+        return node.item
+
+    def __delitem__(self, key):
+        """
+        Removes the key and its item from the map.
+
+        :param key: The key to remove.
+        :return: None
+        :raises KeyError: If the key is not present.
+        """
+        size = len(self)
+        self.delete(self._order(key))
+        if len(self) == size:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        """
+        Checks whether the key is present in the map.
+
+        :param key: The key to look up.
+        :return: True if the key is present, False otherwise.
+        """
+        return self.search(self._order(key)) is not None
+
+    def get(self, key, default=None):
+        """
+        Returns the item associated with the key, or the default if it is not present.
+
+        :param key: The key to look up.
+        :param default: The value returned for a missing key. Defaults to None.
+        :return: The item associated with the key, or the default.
+        """
+        node = self.search(self._order(key))
+        return default if node is None else node.item
+
+    def pop(self, key, default=_MISSING):
+        """
+        Removes the key and returns its item, with a single descent. The observer, if
+        any, is notified once, about the deletion or the miss.
+
+        :param key: The key to remove.
+        :param default: The value returned for a missing key. If not given, a missing
+                        key raises KeyError.
+        :return: The item that was associated with the key, or the default.
+        :raises KeyError: If the key is not present and no default was given.
+        """
+        order = self._order(key)
+        node = self._find(order)
+        if node is None:
+            if self.observer is not None:
+                self.observer.on_miss(order)
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        self._remove_node(node)
+        return node.item
+
+    def setdefault(self, key, default=None):
+        """
+        Returns the item associated with the key. If the key is not present, it is
+        inserted with the default item first, in the same single descent.
+
+        :param key: The key to look up.
+        :param default: The item stored for a missing key. Defaults to None.
+        :return: The item associated with the key.
+        """
+        size = len(self)
+        node = self.insert(self._order(key))
+        if len(self) != size:
+            node.key = key
+            self._set_item(node, default)
+        return node.item
+
+    def __nodes(self, reverse=False):
+        """
+        Lazily yields the nodes of the map in key order.
+
+        :param reverse: Whether to walk from the largest key down. Defaults to False.
+        :return: A generator of nodes.
+        """
+        if self.root is None:
+            return
+        node = self.maximum() if reverse else self.minimum()
+        while node:
+            yield node
+            node = self.predecessor(node) if reverse else self.successor(node)
+
+    def __iter__(self):
+        """
+        Lazily yields the keys of the map in ascending order.
+
+        :return: A generator of keys.
+        """
+        for node in self.__nodes():
+            yield node.key
+
+    def __reversed__(self):
+        """
+        Lazily yields the keys of the map in descending order.
+
+        :return: A generator of keys.
+        """
+        for node in self.__nodes(reverse=True):
+            yield node.key
+
+    def keys(self):
+        """
+        Lazily yields the keys of the map in ascending order.
+
+        :return: A generator of keys.
+        """
+        return iter(self)
+
+    def values(self):
+        """
+        Lazily yields the items of the map in the order of their keys.
+
+        :return: A generator of items.
+        """
+        for node in self.__nodes():
+            yield node.item
+
+    def items(self):
+        """
+        Lazily yields the (key, item) pairs of the map in ascending key order.
+
+        :return: A generator of pairs.
+        """
+        for node in self.__nodes():
+            yield node.key, node.item
@@ -0,0 +1,194 @@
+"""Multiset based on the Red Black Tree"""
+from collections import Counter
+from itertools import repeat
+
+from rb_tree import Node, RBTree
+
+
+class CountedNode(Node):
+    """
+    Node of an `RBMultiset`, storing how many times its value occurs.
+    """
+    __slots__ = ('count',)
+
+    def __init__(self, value, color='red'):
+        super().__init__(value, color)
+        self.count = 1
+
+    def copy(self):
+        node = super().copy()
+        node.count = self.count
+        return node
+
+
+class RBMultiset(RBTree):
+    """
+    Sorted multiset built on the Red Black Tree.
+
+    Each distinct value is stored once, in a node counting its occurrences. Inserting a
+    value already present only increments the count of its node, after the same
+    O(log n) descent as a search: no node is allocated and the tree is not rebalanced.
+    Deleting decrements the count, and the node leaves the tree when it drops to zero.
+
+    Like the keys of `collections.Counter`, `len` and plain iteration see the distinct
+    values; `elements` expands every value as many times as it occurs. Like
+    `Counter.update`, `update` (and so `union` and `|`) adds the occurrences of the
+    other values. The other set operations, `split` and `join` inherited from `RBTree`
+    work on distinct values, keeping the count of every node they keep. `dump` and
+    `load` refuse multisets, as the file format has no room for the counts.
+    """
+
+    node_class = CountedNode
+
+    @classmethod
+    def from_iterable(cls, iterable, observer=None):
+        """
+        Builds a multiset from values given in any order, counting their occurrences.
+        The distinct values are sorted and the tree is built with `from_sorted`, in
+        O(n log n) time overall.
+
+        :param iterable: Hashable values in any order, possibly with duplicates.
+        :param observer: Optional `TreeObserver` for the new multiset.
+        :return: A new multiset holding every given occurrence.
+        """
+        counts = Counter(iterable)
+        multiset = cls.from_sorted(sorted(counts), observer=observer)
+        for node in multiset.__nodes():
+            node.count = counts[node.value]
+        return multiset
+
+    def update(self, other):
+        """
+        Adds every occurrence of the values of another multiset or iterable, inserting
+        each distinct value once with its count, in O(m log n) time for m distinct
+        values. The observer is notified as by `insert`.
+
+        :param other: An `RBMultiset`, or any iterable of hashable values.
+        :return: This multiset.
+        """
+        if other is self:
+            other = self.copy()
+        counts = other.items() if isinstance(other, RBMultiset) else Counter(other).items()
+        for value, count in counts:
+            self.insert(value, count=count)
+        return self
+
+    def insert(self, value, hint=None, count=1):
+        """
+        Adds occurrences of a value. If the value is already present, the count of its
+        node grows; otherwise a node is inserted as in `RBTree.insert`.
+
+        :param value: The value to be inserted.
+        :param hint: Optional node of this tree to start the search from, see
+                     `RBTree.insert`.
+        :param count: The number of occurrences to add. Defaults to 1.
+        :return: The node holding the value.
+        :raises ValueError: If the count is smaller than 1.
+        """
+        if count < 1:
+            raise ValueError(f"Count must be at least 1, not {count!r}.")
+        if hint is None:
+            parent, node = None, self.root
+            while node:
+                if value == node.value:
+                    node.count += count
+                    if self.observer is not None:
+                        self.observer.on_insert(value)
+                    return node
+                parent = node
+                node = node.left if value < node.value else node.right
+            # The new node goes right under `parent`, so the search starts there
+            node = super().insert(value, hint=parent)
+            node.count = count
+            return node
+
+        size = len(self)
+        node = super().insert(value, hint)
+        if len(self) == size:
+            node.count += count
+            if self.observer is not None:
+                self.observer.on_insert(value)
+        else:
+            node.count = count
+        return node
+
+    def delete(self, value, count=1):
+        """
+        Removes occurrences of a value. The node is deleted from the tree only when
+        no occurrence is left.
+
+        :param value: The value to be deleted.
+        :param count: The number of occurrences to remove, or None to remove them all.
+                      Defaults to 1.
+        :return: None
+        :raises ValueError: If the count is smaller than 1.
+        """
+        if count is not None and count < 1:
+            raise ValueError(f"Count must be at least 1, not {count!r}.")
+        node = self._find(value)
+        if node is None:
+            if self.observer is not None:
+                self.observer.on_miss(value)
+        elif count is not None and node.count > count:
+            node.count -= count
+            if self.observer is not None:
+                self.observer.on_delete(value)
+        else:
+            self._remove_node(node)
+
+    def count(self, value):
+        """
+        Returns the number of occurrences of a value.
+
+        :param value: The value to look up.
+        :return: The count, 0 if the value is not present.
+        """
+        node = self._find(value)
+        return 0 if node is None else node.count
+
+    def __contains__(self, value):
+        """
+        Checks whether the value occurs at least once.
+
+        :param value: The value to look up.
+        :return: True if the value is present, False otherwise.
+        """
+        return self._find(value) is not None
+
+    def __nodes(self):
+        """
+        Lazily yields the nodes of the multiset in ascending order.
+
+        :return: A generator of nodes.
+        """
+        node = self.minimum() if self.root else None
+        while node:
+            yield node
+            node = self.successor(node)
+
+    def elements(self):
+        """
+        Lazily yields every occurrence of every value in ascending order, repeating
+        each value as many times as it occurs without materializing the repeats.
+
+        :return: A generator of values.
+        """
+        for node in self.__nodes():
+            yield from repeat(node.value, node.count)
+
+    def items(self):
+        """
+        Lazily yields the distinct values with their counts in ascending order.
+
+        :return: A generator of (value, count) tuples.
+        """
+        for node in self.__nodes():
+            yield node.value, node.count
+
+    def total(self):
+        """
+        Counts all occurrences of all values, walking every node in O(n) time.
+
+        :return: The sum of the counts.
+        """
+        return sum(node.count for node in self.__nodes())
@@ -0,0 +1,430 @@
+"""Persistent Red Black Tree Implementation"""
+
+
+class PersistentNode:
+    """
+    Node of a `PersistentRBTree`. It has no parent reference, because a node can be
+    shared by many versions of the tree and have a different parent in each of them.
+    """
+    __slots__ = ('value', 'red', 'left', 'right')
+
+    def __init__(self, value, red=True):
+        self.value = value
+        self.red = red
+        self.left = None
+        self.right = None
+
+    def copy(self):
+        """
+        Creates a copy of the node, linked to the same children.
+
+        :return: The new node.
+        """
+        node = PersistentNode(self.value, self.red)
+        node.left = self.left
+        node.right = self.right
+        return node
+
+
+def _is_black(node):
+    """
+    Tells whether a node, possibly a NULL leaf, is black.
+
+    :param node: The node or None.
+    :return: True if the node is black.
+    """
+    return node is None or not node.red
+
+
+def _relink(path, index, old, new, root):
+    """
+    Puts `new` in the place of `old`, the node at `path[index]`, under its parent.
+
+    :param path: The nodes from the root down, all of them copied in this operation.
+    :param index: Position of `old` on the path.
+    :param old: The node being replaced.
+    :param new: The node taking its place.
+    :param root: The current root.
+    :return: The root after the replacement.
+    """
+    if index == 0:
+        return new
+    parent = path[index - 1]
+    if parent.left is old:
+        parent.left = new
+    else:
+        parent.right = new
+    return root
+
+
+class PersistentRBTree:
+    """
+    Persistent (functional) Red Black Tree.
+
+    A tree is never modified: `insert` and `delete` return a new version, copying only
+    the O(log n) nodes on the search path and the few siblings touched while fixing
+    colors, and sharing every other node with the previous version. Old versions stay
+    valid forever, so readers can keep querying a version while a writer produces new
+    ones without any locking, and `snapshot` is O(1).
+
+    The fix-up cases are the same as in `RBTree`, but the ancestors of a node are taken
+    from the copied search path instead of parent references.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.count = 0
+
+    @classmethod
+    def __version(cls, root, count):
+        """
+        Creates a tree object for a new version.
+
+        :param root: Root node of the version.
+        :param count: Number of values in the version.
+        :return: The new tree.
+        """
+        tree = cls()
+        tree.root = root
+        tree.count = count
+        return tree
+
+    def snapshot(self):
+        """
+        Returns a version of the tree that will never change. Since versions are
+        immutable, this is the tree itself and costs O(1).
+
+        :return: This tree.
+        """
+        return self
+
+    def __len__(self):
+        """
+        Returns the number of values in this version.
+
+        :return: The number of nodes.
+        """
+        return self.count
+
+    def insert(self, value):
+        """
+        Returns a new version of the tree with the value inserted. The nodes on the
+        search path are copied and the new red leaf is fixed up the copied path.
+
+        :param value: The value to be inserted.
+        :return: A new tree, or this tree if the value is already present.
+        """
+        path = []
+        node = self.root
+        while node is not None:
+            if value == node.value:
+                return self
+            clone = node.copy()
+            if path:
+                if path[-1].left is node:
+                    path[-1].left = clone
+                else:
+                    path[-1].right = clone
+            path.append(clone)
+            node = clone.left if value < clone.value else clone.right
+
+        leaf = PersistentNode(value)
+        if path:
+            if value < path[-1].value:
+                path[-1].left = leaf
+            else:
+                path[-1].right = leaf
+        path.append(leaf)
+        root = self.__fix_insert(path)
+        root.red = False
+        return self.__version(root, self.count + 1)
+
+    @staticmethod
+    def __fix_insert(path):
+        """
+        Fixes red-red violations after an insertion, going up the copied search path.
+        The uncle is copied before being recolored, as it is not on the path.
+
+        :param path: Copied nodes from the root down to the new leaf.
+        :return: The new root.
+        """
+        root = path[0]
+        index = len(path) - 1
+        while index >= 2 and path[index - 1].red:
+            node, parent, grandparent = path[index], path[index - 1], path[index - 2]
+            if parent is grandparent.left:
+                uncle = grandparent.right
+                if uncle is not None and uncle.red:  # Case 1
+                    uncle = uncle.copy()
+                    grandparent.right = uncle
+                    parent.red = False
+                    uncle.red = False
+                    grandparent.red = True
+                    index -= 2
+                    continue
+                if node is parent.right:  # Case 2
+                    parent.right = node.left
+                    node.left = parent
+                    grandparent.left = node
+                    parent = node
+                grandparent.left = parent.right  # Case 3
+                parent.right = grandparent
+            else:
+                uncle = grandparent.left
+                if uncle is not None and uncle.red:  # Case 1
+                    uncle = uncle.copy()
+                    grandparent.left = uncle
+                    parent.red = False
+                    uncle.red = False
+                    grandparent.red = True
+                    index -= 2
+                    continue
+                if node is parent.left:  # Case 2
+                    parent.left = node.right
+                    node.right = parent
+                    grandparent.right = node
+                    parent = node
+                grandparent.right = parent.left  # Case 3
+                parent.left = grandparent
+            parent.red = False
+            grandparent.red = True
+            root = _relink(path, index - 2, grandparent, parent, root)
+            break
+        return root
+
+    def delete(self, value):
+        """
+        Returns a new version of the tree without the value. The nodes on the search
+        path down to the removed node are copied; a node with two children takes the
+        value of its successor in its copy, and the successor is removed instead.
+
+        :param value: The value to be deleted.
+        :return: A new tree, or this tree if the value is not present.
+        """
+        originals = []
+        node = self.root
+        while node is not None and node.value != value:
+            originals.append(node)
+            node = node.left if value < node.value else node.right
+        if node is None:
+            return self
+        target = len(originals)
+        originals.append(node)
+        if node.left is not None and node.right is not None:
+            node = node.right
+            while node is not None:
+                originals.append(node)
+                node = node.left
+
+        path = [originals[0].copy()]
+        for original in originals[1:]:
+            clone = original.copy()
+            if path[-1].left is original:
+                path[-1].left = clone
+            else:
+                path[-1].right = clone
+            path.append(clone)
+        removed = path.pop()
+        if len(path) > target:
+            # Two children: the copy takes the value of the successor, which is removed
+            path[target].value = removed.value
+
+        child = removed.left if removed.left is not None else removed.right
+        if child is not None:
+            child = child.copy()
+        if path:
+            root = path[0]
+            is_left = path[-1].left is removed
+            if is_left:
+                path[-1].left = child
+            else:
+                path[-1].right = child
+        else:
+            root = child
+            is_left = False
+        if not removed.red:
+            root = self.__fix_delete(path, child, is_left, root)
+        if root is not None:
+            root.red = False
+        return self.__version(root, self.count - 1)
+
+    @staticmethod
+    def __fix_delete(path, node, is_left, root):
+        """
+        Fixes the black height deficit after removing a black node, going up the copied
+        search path. Siblings and nephews are copied before being recolored or rotated,
+        as they are not on the path.
+
+        :param path: Copied nodes from the root down to the parent of `node`.
+        :param node: The node that took the place of the removed one, possibly None.
+        :param is_left: Whether `node` is the left child of the last node of the path.
+        :param root: The current root.
+        :return: The new root.
+        """
+        index = len(path) - 1
+        while index >= 0 and _is_black(node):
+            parent = path[index]
+            if is_left:
+                sibling = parent.right.copy()
+                parent.right = sibling
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    parent.right = sibling.left
+                    sibling.left = parent
+                    root = _relink(path, index, parent, sibling, root)
+                    path.insert(index, sibling)
+                    index += 1
+                    sibling = parent.right.copy()
+                    parent.right = sibling
+                if _is_black(sibling.left) and _is_black(sibling.right):
+                    sibling.red = True
+                    node = parent
+                    index -= 1
+                    is_left = index >= 0 and path[index].left is node
+                    continue
+                if _is_black(sibling.right):
+                    nephew = sibling.left.copy()
+                    nephew.red = False
+                    sibling.red = True
+                    sibling.left = nephew.right
+                    nephew.right = sibling
+                    parent.right = nephew
+                    sibling = nephew
+                nephew = sibling.right.copy()
+                nephew.red = False
+                sibling.right = nephew
+                sibling.red = parent.red
+                parent.red = False
+                parent.right = sibling.left
+                sibling.left = parent
+            else:
+                sibling = parent.left.copy()
+                parent.left = sibling
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    parent.left = sibling.right
+                    sibling.right = parent
+                    root = _relink(path, index, parent, sibling, root)
+                    path.insert(index, sibling)
+                    index += 1
+                    sibling = parent.left.copy()
+                    parent.left = sibling
+                if _is_black(sibling.left) and _is_black(sibling.right):
+                    sibling.red = True
+                    node = parent
+                    index -= 1
+                    is_left = index >= 0 and path[index].left is node
+                    continue
+                if _is_black(sibling.left):
+                    nephew = sibling.right.copy()
+                    nephew.red = False
+                    sibling.red = True
+                    sibling.right = nephew.left
+                    nephew.left = sibling
+                    parent.left = nephew
+                    sibling = nephew
+                nephew = sibling.left.copy()
+                nephew.red = False
+                sibling.left = nephew
+                sibling.red = parent.red
+                parent.red = False
+                parent.left = sibling.right
+                sibling.right = parent
+            return _relink(path, index, parent, sibling, root)
+        if node is not None:
+            node.red = False
+        return root
+
+    def search(self, value):
+        """
+        Search this version for a node with the given value.
+        :param value: Value to be found
+        :return: The node if found, or None if not found.
+        """
+        current = self.root
+        while current is not None:
+            if current.value == value:
+                return current
+            current = current.left if value < current.value else current.right
+        return None
+
+    def __contains__(self, value):
+        """
+        Checks whether the value is present in this version.
+
+        :param value: The value to look up.
+        :return: True if the value is present, False otherwise.
+        """
+        return self.search(value) is not None
+
+    def minimum(self):
+        """
+        Finds the node with the minimum value of this version.
+
+        :return: The node with the minimum value, or None if the tree is empty.
+        """
+        node = self.root
+        while node is not None and node.left is not None:
+            node = node.left
+        return node
+
+    def maximum(self):
+        """
+        Finds the node with the maximum value of this version.
+
+        :return: The node with the maximum value, or None if the tree is empty.
+        """
+        node = self.root
+        while node is not None and node.right is not None:
+            node = node.right
+        return node
+
+    def __iter__(self):
+        """
+        Lazily yields the values of this version in ascending order. Without parent
+        references the walk keeps a stack of O(log n) pending ancestors.
+
+        :return: A generator of values in ascending order.
+        """
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    def is_valid(self):
+        """
+        Validates whether this version satisfies Red-Black Tree properties.
+        :return: True if valid, False otherwise.
+        """
+
+        def __check_properties(node):
+            """
+            Check the subtree rooted at the given node.
+
+            :param node: The current node to validate.
+
+            Returns:
+                (int, bool): A tuple containing the black height of the subtree
+                and a boolean indicating whether the subtree is valid.
+            """
+            if node is None:
+                return 1, True
+            left_black_height, left_valid = __check_properties(node.left)
+            right_black_height, right_valid = __check_properties(node.right)
+            if not left_valid or not right_valid or left_black_height != right_black_height:
+                return 0, False
+            if node.red and not (_is_black(node.left) and _is_black(node.right)):
+                return 0, False
+            return left_black_height + (0 if node.red else 1), True
+
+        if self.root is not None and self.root.red:
+            return False
+        _, is_valid_tree = __check_properties(self.root)
+        return is_valid_tree
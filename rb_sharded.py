@@ -0,0 +1,569 @@
+"""Red Black Tree sharded by key ranges, with shards kept in worker processes"""
+import multiprocessing
+from bisect import bisect_right
+from itertools import count
+
+from rb_tree import RBTree
+
+
+# Commands run on the shards, in this process or in a worker. Each takes the dict of
+# shards held by its process, the id of the shard it works on and its own arguments.
+# They are defined at module level so that worker processes can run them.
+
+def _build(store, shard, values):
+    """
+    Creates a shard from values in strictly ascending order.
+
+    :param values: The values of the shard.
+    :return: The size of the shard.
+    """
+    store[shard] = RBTree.from_sorted(values)
+    return len(store[shard])
+
+
+def _search(store, shard, values):
+    """
+    Looks up values in a shard.
+
+    :param values: The values to look up.
+    :return: A list of booleans telling whether each value is present.
+    """
+    tree = store[shard]
+    return [tree.search(value) is not None for value in values]
+
+
+def _insert(store, shard, values):
+    """
+    Inserts values into a shard.
+
+    :param values: The values to insert.
+    :return: The size of the shard.
+    """
+    tree = store[shard]
+    for value in values:
+        tree.insert(value)
+    return len(tree)
+
+
+def _delete(store, shard, values):
+    """
+    Deletes values from a shard.
+
+    :param values: The values to delete.
+    :return: The size of the shard.
+    """
+    tree = store[shard]
+    for value in values:
+        tree.delete(value)
+    return len(tree)
+
+
+def _count(store, shard, ranges):
+    """
+    Counts the values of a shard within each closed range, with two rank queries.
+
+    :param ranges: A list of (low, high) pairs.
+    :return: A list of counts.
+    """
+    tree = store[shard]
+    counts = []
+    for low, high in ranges:
+        upper = tree.rank(high) + (tree.search(high) is not None)
+        counts.append(max(upper - tree.rank(low), 0))
+    return counts
+
+
+def _irange(store, shard, low, high, inclusive):
+    """
+    Collects the values of a shard within a range, see `RBTree.irange`.
+
+    :param low: Lower bound of the range, or None for no lower bound.
+    :param high: Upper bound of the range, or None for no upper bound.
+    :param inclusive: Pair of flags telling whether the bounds belong to the range.
+    :return: A list of values in ascending order.
+    """
+    return list(store[shard].irange(low, high, inclusive))
+
+
+def _split(store, shard, new):
+    """
+    Splits a shard at its median, moving the greater half into a new shard.
+
+    :param new: The id of the new shard.
+    :return: A tuple (median, size of the shard, size of the new shard).
+    """
+    tree = store[shard]
+    median = tree.select(len(tree) // 2).value
+    _, store[new] = tree.split(median)
+    return median, len(tree), len(store[new])
+
+
+def _join(store, shard, other):
+    """
+    Appends the shard holding the next greater values to a shard.
+
+    :param other: The id of the appended shard, which is removed.
+    :return: The size of the joined shard.
+    """
+    store[shard].join(store.pop(other))
+    return len(store[shard])
+
+
+def _export(store, shard):
+    """
+    Removes a shard from its process, to be moved to another one.
+
+    :return: The tree of the shard.
+    """
+    return store.pop(shard)
+
+
+def _import(store, shard, tree):
+    """
+    Takes over a shard moved from another process.
+
+    :param tree: The tree of the shard.
+    :return: The size of the shard.
+    """
+    store[shard] = tree
+    return len(tree)
+
+
+def _validate(store, shard, low, high):
+    """
+    Validates a shard and checks that its values lie within its boundaries.
+
+    :param low: The boundary below the shard, or None.
+    :param high: The boundary above the shard, or None.
+    :return: A tuple (valid, size of the shard).
+    """
+    tree = store[shard]
+    valid = tree.is_valid()
+    if valid and tree.root is not None:
+        valid = (low is None or not tree.minimum().value < low) and \
+            (high is None or tree.maximum().value < high)
+    return valid, len(tree)
+
+
+_COMMANDS = {function.__name__[1:]: function for function in (
+    _build, _search, _insert, _delete, _count, _irange, _split, _join, _export, _import,
+    _validate)}
+
+
+def _execute(store, requests):
+    """
+    Runs a batch of commands one after another.
+
+    :param store: The dict of shards held by this process.
+    :param requests: A list of (shard, command, arguments) tuples.
+    :return: A list of their results.
+    """
+    return [_COMMANDS[command](store, shard, *arguments)
+            for shard, command, arguments in requests]
+
+
+def _serve(connection):
+    """
+    Main loop of a worker process: runs the batches it receives on the shards it holds
+    until it receives None. Exceptions are sent back instead of results.
+
+    :param connection: The worker's end of a `multiprocessing.Pipe`.
+    :return: None
+    """
+    store = {}
+    while True:
+        requests = connection.recv()
+        if requests is None:
+            return
+        try:
+            connection.send((True, _execute(store, requests)))
+        except Exception as error:  # pylint: disable=broad-except
+            connection.send((False, error))
+
+
+class ShardedRBTree:
+    """
+    Set of values partitioned by key ranges into shards, each an `RBTree`.
+
+    Shard i holds the values v with `boundaries[i - 1] <= v < boundaries[i]`, so a value
+    is routed to its shard by a binary search over the small boundary list. The shards
+    live either in this process or, given a number of `processes`, in worker processes
+    that keep them for the lifetime of the container. Only commands and their results
+    cross the process boundary: a bulk operation groups its values by shard, sends one
+    batch to every worker owning some of those shards, lets the workers run at the same
+    time, and merges the results back in input order. Single-value operations make one
+    round trip each, so workers pay off for bulk operations only.
+
+    This process keeps the boundaries and the size of every shard. Whenever a shard
+    grows over `max_ratio` times the average shard size, it is split at its median with
+    `RBTree.split` inside its worker, and the greater half moves to the worker holding
+    the fewest values if that evens out the load. The two adjacent shards with the
+    fewest values together are then joined with `RBTree.join`, after moving the smaller
+    one next to the other if they live apart, keeping the number of shards. A join that
+    would exceed the limit itself is skipped, so with a small `max_ratio` there may be a
+    few more shards than asked for. Moving a shard pickles it, which happens only when
+    shards are split or joined.
+
+    Workers are stopped by `close`, or on leaving a `with` block.
+    """
+
+    def __init__(self, shards=8, processes=None, max_ratio=2.0, min_shard_size=1024):
+        """
+        :param shards: The number of shards. The container starts with a single shard
+                       and splits it as it grows until it has this many.
+        :param processes: The number of worker processes holding the shards. Defaults
+                          to None (keep the shards in this process).
+        :param max_ratio: Largest accepted ratio of a shard's size to the average.
+        :param min_shard_size: Shards smaller than this are never split.
+        """
+        self.shard_count = shards
+        self.max_ratio = max_ratio
+        self.min_shard_size = max(min_shard_size, 2)
+        self.boundaries = []
+        self.sizes = [0]
+        self.__ids = [0]
+        self.__owners = {0: 0}
+        self.__next_id = count(1)
+        self.__store = {}
+        self.__connections = []
+        self.__processes = []
+        for _ in range(processes or 0):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            self.__connections.append(parent)
+            self.__processes.append(process)
+        self.__run([(0, 'build', ([],))])
+
+    @classmethod
+    def from_iterable(cls, iterable, shards=8, **options):
+        """
+        Builds a container from values given in any order, with shards of equal sizes
+        each built by `RBTree.from_sorted` in its worker.
+
+        :param iterable: Values in any order, possibly with duplicates.
+        :param shards: The number of shards.
+        :param options: Other arguments of the constructor.
+        :return: The new container.
+        """
+        values = sorted(set(iterable))
+        container = cls(shards, **options)
+        number = max(min(shards, len(values)), 1)
+        bounds = [len(values) * i // number for i in range(number + 1)]
+        container.__ids = [0] + [next(container.__next_id) for _ in range(number - 1)]
+        workers = container.__workers()
+        container.__owners = {shard: i % workers for i, shard in enumerate(container.__ids)}
+        container.sizes = container.__run([
+            (shard, 'build', (values[low:high],))
+            for shard, low, high in zip(container.__ids, bounds, bounds[1:])])
+        container.boundaries = [values[low] for low in bounds[1:-1]]
+        return container
+
+    def close(self):
+        """
+        Stops the worker processes. The shards they hold are lost.
+
+        :return: None
+        """
+        for connection in self.__connections:
+            connection.send(None)
+            connection.close()
+        for process in self.__processes:
+            process.join()
+        self.__connections = []
+        self.__processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __workers(self):
+        """
+        :return: The number of processes holding shards.
+        """
+        return len(self.__connections) or 1
+
+    def __run(self, requests):
+        """
+        Runs commands on the shards, sending one batch to every worker involved before
+        collecting any result, so that the workers run at the same time.
+
+        :param requests: A list of (shard id, command, arguments) tuples.
+        :return: A list of their results, in the order of the requests.
+        """
+        if not self.__connections:
+            return _execute(self.__store, requests)
+        batches, positions = {}, {}
+        for position, request in enumerate(requests):
+            owner = self.__owners[request[0]]
+            batches.setdefault(owner, []).append(request)
+            positions.setdefault(owner, []).append(position)
+        for owner, batch in batches.items():
+            self.__connections[owner].send(batch)
+        results = [None] * len(requests)
+        error = None
+        for owner in batches:
+            succeeded, outcome = self.__connections[owner].recv()
+            if not succeeded:
+                error = outcome
+                continue
+            for position, result in zip(positions[owner], outcome):
+                results[position] = result
+        if error is not None:
+            raise error
+        return results
+
+    def __shard(self, value):
+        """
+        Finds the index of the shard a value belongs to.
+
+        :param value: The value.
+        :return: The index of the shard.
+        """
+        return bisect_right(self.boundaries, value)
+
+    def __len__(self):
+        """
+        Returns the number of values in all shards.
+
+        :return: The number of values.
+        """
+        return sum(self.sizes)
+
+    def __iter__(self):
+        """
+        Lazily yields all values in ascending order, fetching one shard at a time.
+
+        :return: A generator of values.
+        """
+        return self.irange()
+
+    def __contains__(self, value):
+        """
+        Checks whether the value is present.
+
+        :param value: The value to look up.
+        :return: True if the value is present, False otherwise.
+        """
+        return self.__run([(self.__ids[self.__shard(value)], 'search', ([value],))])[0][0]
+
+    def insert(self, value):
+        """
+        Inserts a value into its shard, then rebalances the shards if needed.
+
+        :param value: The value to be inserted.
+        :return: None
+        """
+        index = self.__shard(value)
+        self.sizes[index] = self.__run([(self.__ids[index], 'insert', ([value],))])[0]
+        self.__rebalance(index)
+
+    def delete(self, value):
+        """
+        Deletes a value from its shard.
+
+        :param value: The value to be deleted.
+        :return: None
+        """
+        index = self.__shard(value)
+        self.sizes[index] = self.__run([(self.__ids[index], 'delete', ([value],))])[0]
+
+    def irange(self, low=None, high=None, inclusive=(True, True)):
+        """
+        Lazily yields the values between `low` and `high` in ascending order, see
+        `RBTree.irange`. Only the shards overlapping the range are visited, and the
+        values of each are fetched at once.
+
+        :param low: Lower bound of the range, or None for no lower bound.
+        :param high: Upper bound of the range, or None for no upper bound.
+        :param inclusive: Pair of flags telling whether the bounds belong to the range.
+        :return: A generator of values within the range.
+        """
+        first = 0 if low is None else self.__shard(low)
+        last = len(self.__ids) - 1 if high is None else self.__shard(high)
+        for shard in self.__ids[first:last + 1]:
+            yield from self.__run([(shard, 'irange', (low, high, inclusive))])[0]
+
+    def __group(self, values):
+        """
+        Groups values by shard, remembering their positions.
+
+        :param values: The values.
+        :return: A tuple of two dicts mapping shard indices to lists of values and to
+                 lists of their positions.
+        """
+        groups, positions = {}, {}
+        for position, value in enumerate(values):
+            index = self.__shard(value)
+            groups.setdefault(index, []).append(value)
+            positions.setdefault(index, []).append(position)
+        return groups, positions
+
+    def __fan_out(self, command, groups):
+        """
+        Runs a command on every shard having work, all at once.
+
+        :param command: The name of the command.
+        :param groups: A dict mapping shard indices to the argument of the command.
+        :return: A dict mapping the same indices to the results.
+        """
+        indices = list(groups)
+        results = self.__run([(self.__ids[index], command, (groups[index],))
+                              for index in indices])
+        return dict(zip(indices, results))
+
+    def search_many(self, values):
+        """
+        Looks up many values at once, one batch per worker.
+
+        :param values: The values to look up.
+        :return: A list of booleans telling whether each value is present, in the
+                 order of the values.
+        """
+        values = list(values)
+        groups, positions = self.__group(values)
+        found = [False] * len(values)
+        for index, results in self.__fan_out('search', groups).items():
+            for position, result in zip(positions[index], results):
+                found[position] = result
+        return found
+
+    def insert_many(self, values):
+        """
+        Inserts many values at once, one batch per worker, then rebalances the shards.
+
+        :param values: The values to insert.
+        :return: None
+        """
+        groups, _ = self.__group(values)
+        for index, size in self.__fan_out('insert', groups).items():
+            self.sizes[index] = size
+        # Every split halves a shard over the limit, and joins stay within it, so this
+        # settles quickly; the cap bounds the work of a single call all the same
+        for _ in range(self.shard_count):
+            largest = max(range(len(self.sizes)), key=self.sizes.__getitem__)
+            if not self.__rebalance(largest):
+                break
+
+    def delete_many(self, values):
+        """
+        Deletes many values at once, one batch per worker.
+
+        :param values: The values to delete.
+        :return: None
+        """
+        groups, _ = self.__group(values)
+        for index, size in self.__fan_out('delete', groups).items():
+            self.sizes[index] = size
+
+    def count_range(self, low, high):
+        """
+        Counts the values between `low` and `high`, both included. Shards lying wholly
+        within the range contribute their known size, and the two shards holding the
+        bounds two rank queries each.
+
+        :param low: Lower bound of the range.
+        :param high: Upper bound of the range.
+        :return: The number of values in the range.
+        """
+        return self.count_ranges([(low, high)])[0]
+
+    def count_ranges(self, ranges):
+        """
+        Counts the values within many closed ranges at once. Every range is cut at the
+        shard boundaries; shards lying wholly within a range contribute their known
+        size, and the pieces cutting a shard are counted in its worker.
+
+        :param ranges: A list of (low, high) pairs.
+        :return: A list of counts, in the order of the ranges.
+        """
+        ranges = list(ranges)
+        counts = [0] * len(ranges)
+        groups, positions = {}, {}
+        for position, (low, high) in enumerate(ranges):
+            if high < low:
+                continue
+            first, last = self.__shard(low), self.__shard(high)
+            counts[position] = sum(self.sizes[first + 1:last])
+            for index in {first, last}:
+                groups.setdefault(index, []).append((low, high))
+                positions.setdefault(index, []).append(position)
+        for index, results in self.__fan_out('count', groups).items():
+            for position, result in zip(positions[index], results):
+                counts[position] += result
+        return counts
+
+    def __move(self, shard, owner):
+        """
+        Moves a shard to another worker.
+
+        :param shard: The id of the shard.
+        :param owner: The index of the worker to move it to.
+        :return: None
+        """
+        tree = self.__run([(shard, 'export', ())])[0]
+        self.__owners[shard] = owner
+        self.__run([(shard, 'import', (tree,))])
+
+    def __rebalance(self, index):
+        """
+        Splits a shard grown too large at its median, then, while there are more shards
+        than wanted, joins the two adjacent shards with the fewest values as long as
+        the joined shard stays within the limit.
+
+        :param index: The index of the shard that grew.
+        :return: True if the shard was split, False otherwise.
+        """
+        size = self.sizes[index]
+        limit = self.max_ratio * len(self) / self.shard_count
+        if size < self.min_shard_size or \
+                not (size > limit or len(self.__ids) < self.shard_count):
+            return False
+        shard, new = self.__ids[index], next(self.__next_id)
+        median, left, right = self.__run([(shard, 'split', (new,))])[0]
+        self.__ids.insert(index + 1, new)
+        self.sizes[index:index + 1] = [left, right]
+        self.boundaries.insert(index, median)
+        self.__owners[new] = self.__owners[shard]
+
+        # Move the new half to the least loaded worker if that evens out the load
+        loads = [0] * self.__workers()
+        for other, other_size in zip(self.__ids, self.sizes):
+            loads[self.__owners[other]] += other_size
+        target = loads.index(min(loads))
+        if loads[target] + right < loads[self.__owners[new]]:
+            self.__move(new, target)
+
+        while len(self.__ids) > self.shard_count:
+            sums = [a + b for a, b in zip(self.sizes, self.sizes[1:])]
+            pair = sums.index(min(sums))
+            if sums[pair] > limit:
+                break
+            first, second = self.__ids[pair], self.__ids[pair + 1]
+            if self.__owners[first] != self.__owners[second]:
+                if self.sizes[pair] < self.sizes[pair + 1]:
+                    self.__move(first, self.__owners[second])
+                else:
+                    self.__move(second, self.__owners[first])
+            self.sizes[pair] = self.__run([(first, 'join', (second,))])[0]
+            del self.__ids[pair + 1], self.sizes[pair + 1], self.boundaries[pair]
+            del self.__owners[second]
+        return True
+
+    def is_valid(self):
+        """
+        Validates every shard, checks that its values lie within its boundaries and
+        that its size is the one known to this process.
+
+        :return: True if valid, False otherwise.
+        """
+        if not len(self.boundaries) == len(self.sizes) - 1 == len(self.__ids) - 1:
+            return False
+        bounds = [None] + self.boundaries + [None]
+        results = self.__run([(shard, 'validate', (bounds[i], bounds[i + 1]))
+                              for i, shard in enumerate(self.__ids)])
+        return all(valid and size == known
+                   for (valid, size), known in zip(results, self.sizes))
@@ -0,0 +1,94 @@
+""" Range Aggregate Map Unit Tests"""
+import math
+import random
+
+from rb_aggregate import AggregateMap
+
+
+def check_totals(tree_map):
+    """ Check the total of every node against its subtree """
+    def __check(node):
+        if node is None:
+            return tree_map.identity
+        total = tree_map.combine(tree_map.combine(__check(node.left), node.item),
+                                 __check(node.right))
+        assert node.total == total, f"Wrong total at key {node.key}"
+        return total
+    __check(tree_map.root)
+
+def test_range_sums():
+    """ Test range sums against a scan, through inserts, updates and deletes """
+    generator = random.Random(6)
+    volumes = {}
+    tree_map = AggregateMap()
+    for _ in range(2_000):
+        price = generator.randrange(1_000)
+        volume = generator.randrange(100)
+        tree_map[price] = volume
+        volumes[price] = volume
+    for price in generator.sample(sorted(volumes), 300):
+        del tree_map[price]
+        del volumes[price]
+    check_totals(tree_map)
+    assert tree_map.is_valid() is True
+    for _ in range(300):
+        low = generator.randrange(-10, 1_010)
+        high = low + generator.randrange(200)
+        expected = sum(v for p, v in volumes.items() if low <= p <= high)
+        assert tree_map.aggregate(low, high) == expected
+    assert tree_map.aggregate() == sum(volumes.values())
+    assert tree_map.aggregate(high=100) == sum(v for p, v in volumes.items() if p <= 100)
+    assert tree_map.aggregate(5, 4) == 0
+
+def test_minimum_and_order():
+    """ Test a minimum and a non-commutative aggregate """
+    minimum = AggregateMap(min, math.inf)
+    text = AggregateMap(lambda a, b: a + b, "")
+    for key, letter in zip([5, 1, 4, 2, 3, 9, 7, 8, 6], "ebdcaigfh"):
+        minimum[key] = ord(letter)
+        text[key] = letter
+    assert text.aggregate() == "bcadehgfi"
+    assert text.aggregate(2, 6) == "cadeh"
+    assert minimum.aggregate(4, 9) == min(minimum[k] for k in range(4, 10))
+    assert minimum.aggregate(10, 20) == math.inf
+    text.setdefault(0, "z")
+    text.pop(5)
+    check_totals(text)
+    assert text.aggregate(0, 6) == "zbcadh"
+
+def test_split_and_join():
+    """ Test that totals survive splitting and joining """
+    tree_map = AggregateMap()
+    for key in range(100):
+        tree_map[key] = key
+    _, right = tree_map.split(40)
+    check_totals(tree_map)
+    check_totals(right)
+    assert right.aggregate() == sum(range(40, 100))
+    tree_map.join(right)
+    tree_map.delete_range(10, 19)
+    check_totals(tree_map)
+    assert tree_map.aggregate(0, 50) == sum(range(51)) - sum(range(10, 20))
+
+def test_keys_added_without_items():
+    """ Test that keys built or added in bulk hold the identity """
+    tree_map = AggregateMap.from_sorted([1, 2, 3])
+    assert tree_map.aggregate() == 0
+    tree_map[2] = 5
+    assert tree_map.aggregate(1, 3) == 5
+    tree_map = AggregateMap.from_iterable([3, 1])
+    assert tree_map.aggregate(1, 3) == 0
+
+    tree_map = AggregateMap(min, math.inf)
+    tree_map[1] = 4
+    tree_map.update([3, 5])
+    tree_map.symmetric_difference_update([5, 7])
+    assert list(tree_map.keys()) == [1, 3, 7]
+    assert tree_map.aggregate(2, 9) == math.inf and tree_map.aggregate() == 4
+    check_totals(tree_map)
+
+    tree_map = AggregateMap()
+    tree_map.insert(5)
+    tree_map[6] = 1
+    assert tree_map.aggregate() == 1
+    check_totals(tree_map)
@@ -0,0 +1,64 @@
+""" Array-backed Red Black Tree Unit Tests"""
+import random
+
+from rb_array import ArrayRBTree
+
+
+def set_up():
+    """ Set up a new array-backed Red-Black Tree instance before each test """
+    tree = ArrayRBTree()
+    for value in [20, 15, 10, 25, 30, 5, 35, 1]:
+        tree.insert(value)
+    return tree
+
+def test_insert_and_search():
+    """ Test the insert and search methods """
+    tree = set_up()
+    assert tree.is_valid() is True, "Tree is invalid after setup"
+    assert len(tree) == 8
+    assert list(tree) == [1, 5, 10, 15, 20, 25, 30, 35]
+    assert tree.value(tree.search(10)) == 10
+    assert tree.search(100) is None
+    tree.insert(10)
+    assert len(tree) == 8, "Duplicates should be ignored"
+
+def test_minimum_maximum_successor_predecessor():
+    """ Test the minimum, maximum, successor and predecessor methods """
+    tree = set_up()
+    assert tree.value(tree.minimum()) == 1
+    assert tree.value(tree.maximum()) == 35
+    assert tree.value(tree.successor(tree.minimum())) == 5
+    assert tree.value(tree.predecessor(tree.maximum())) == 30
+    assert tree.successor(tree.maximum()) is None
+    assert tree.predecessor(tree.minimum()) is None
+    assert ArrayRBTree().minimum() is None
+
+def test_delete_and_slot_reuse():
+    """ Test deletions against a sorted reference and the reuse of freed slots """
+    generator = random.Random(7)
+    tree = ArrayRBTree(capacity=4)
+    reference = set()
+    for _ in range(3000):
+        value = generator.randrange(500)
+        if generator.random() < 0.6:
+            tree.insert(value)
+            reference.add(value)
+        else:
+            tree.delete(value)
+            reference.discard(value)
+        assert len(tree) == len(reference)
+    assert tree.is_valid() is True, "Tree is invalid after random operations"
+    assert list(tree) == sorted(reference)
+    assert tree.top <= 501, "Freed slots should be reused"
+
+def test_float_keys_and_copy():
+    """ Test float keys and independent snapshots """
+    tree = ArrayRBTree('d')
+    for value in [2.5, -1.0, 3.25, 0.5]:
+        tree.insert(value)
+    snapshot = tree.copy()
+    tree.delete(2.5)
+    tree.insert(7.0)
+    assert list(snapshot) == [-1.0, 0.5, 2.5, 3.25]
+    assert list(tree) == [-1.0, 0.5, 3.25, 7.0]
+    assert snapshot.is_valid() is True and tree.is_valid() is True
@@ -0,0 +1,110 @@
+""" Asynchronous Red Black Tree Unit Tests"""
+import asyncio
+import random
+
+from rb_async import AsyncRBTree, SliceBudget
+
+
+def test_bulk_operations_yield():
+    """ Test that bulk operations let other tasks run between slices """
+    async def scenario():
+        tree = AsyncRBTree(operations=100)
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(len(tree))
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        values = random.Random(3).sample(range(10_000), 5_000)
+        await tree.insert_many(values)
+        inserted = len(ticks)
+        await tree.delete_many(values[::2])
+        task.cancel()
+        return tree, ticks, inserted, values
+
+    tree, ticks, inserted, values = asyncio.run(scenario())
+    assert inserted >= 50 and len(ticks) >= 75
+    # Other tasks only ever see whole inserts, a slice of 100 at a time
+    assert all(count % 100 == 0 for count in ticks[:inserted])
+    assert list(tree) == sorted(values[1::2])
+    assert tree.is_valid() is True
+
+def test_time_budget():
+    """ Test that a slice ends when its time runs out """
+    async def scenario():
+        budget = SliceBudget(operations=10 ** 9, seconds=0)
+        return [await budget.spend() for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [True, True, True]
+
+def test_async_iteration():
+    """ Test asynchronous iteration while another task modifies the tree """
+    async def scenario():
+        tree = AsyncRBTree(operations=10)
+        await tree.insert_many(range(100))
+        seen = []
+
+        async def modify():
+            tree.delete(50)
+            tree.insert(1_000)
+
+        async for value in tree:
+            seen.append(value)
+            if value == 20:
+                await modify()
+        return seen
+
+    seen = asyncio.run(scenario())
+    assert seen == [v for v in range(100) if v != 50] + [1_000]
+
+def test_async_iteration_after_clear():
+    """ Test that iteration stops when another task clears the tree """
+    async def scenario():
+        tree = AsyncRBTree(operations=2)
+        await tree.insert_many(range(10))
+        seen = []
+        async for value in tree:
+            seen.append(value)
+            if value == 4:
+                tree.clear()
+        return seen, len(tree)
+
+    assert asyncio.run(scenario()) == ([0, 1, 2, 3, 4], 0)
+
+def test_validate():
+    """ Test validation, restarting when the tree changes meanwhile """
+    async def scenario():
+        tree = AsyncRBTree(operations=50)
+        await tree.insert_many(range(2_000))
+        writer = asyncio.create_task(tree.delete_many(range(0, 2_000, 3)))
+        valid = await tree.validate(restarts=50)
+        await writer
+        tree.minimum().red = not tree.minimum().red
+        return valid, await tree.validate(), await AsyncRBTree().validate()
+
+    assert asyncio.run(scenario()) == (True, False, True)
+
+def test_validate_under_steady_writes():
+    """ Test that validation gives up instead of restarting forever """
+    async def scenario():
+        tree = AsyncRBTree(operations=100)
+        await tree.insert_many(range(0, 40_000, 2))
+        writing = True
+
+        async def writer():
+            value = 1
+            while writing:
+                tree.insert(value)
+                value += 2
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(writer())
+        result = await asyncio.wait_for(tree.validate(restarts=2), timeout=5)
+        writing = False
+        await task
+        return result, await tree.validate()
+
+    assert asyncio.run(scenario()) == (None, True)
+
@@ -0,0 +1,56 @@
+""" B+ Tree Unit Tests"""
+import random
+
+import pytest
+
+from rb_btree import BPlusTree
+
+
+def test_insert_search_delete():
+    """ Test inserting and deleting against a set, with a small order """
+    generator = random.Random(9)
+    tree = BPlusTree(order=4)
+    values = set()
+    for _ in range(3_000):
+        value = generator.randrange(1_000)
+        if generator.random() < 0.6:
+            tree.insert(value)
+            values.add(value)
+        else:
+            tree.delete(value)
+            values.discard(value)
+        assert len(tree) == len(values)
+    assert tree.is_valid() is True
+    assert list(tree) == sorted(values)
+    assert list(reversed(tree)) == sorted(values, reverse=True)
+    assert all(tree.search(value) == value for value in values)
+    assert tree.search(1_000) is None and 1_000 not in tree
+    for value in list(values):
+        tree.delete(value)
+    assert len(tree) == 0 and tree.is_valid() is True and tree.minimum() is None
+
+def test_neighbours_and_ranges():
+    """ Test minimum, maximum, successor, predecessor and irange """
+    tree = BPlusTree.from_sorted(range(0, 2_000, 2), order=8)
+    assert tree.is_valid() is True
+    assert tree.height() == 4
+    assert (tree.minimum(), tree.maximum()) == (0, 1_998)
+    assert tree.successor(10) == 12 and tree.successor(11) == 12
+    assert tree.predecessor(10) == 8 and tree.predecessor(0) is None
+    assert tree.successor(1_998) is None
+    assert list(tree.irange(10, 20)) == [10, 12, 14, 16, 18, 20]
+    assert list(tree.irange(10, 20, inclusive=(False, False))) == [12, 14, 16, 18]
+    assert list(tree.irange(1_990)) == [1_990, 1_992, 1_994, 1_996, 1_998]
+    assert list(tree.irange(high=4)) == [0, 2, 4]
+    assert list(tree.irange(5, 5)) == []
+
+def test_from_sorted():
+    """ Test bulk building for many sizes """
+    for size in [0, 1, 5, 6, 7, 49, 50, 51, 500]:
+        tree = BPlusTree.from_sorted(range(size), order=6)
+        assert tree.is_valid() is True, f"Invalid bulk built tree of size {size}"
+        assert list(tree) == list(range(size))
+    with pytest.raises(ValueError):
+        BPlusTree.from_sorted([2, 1])
+    with pytest.raises(ValueError):
+        BPlusTree(order=3)
@@ -0,0 +1,108 @@
+""" Thread-safe Red Black Tree Unit Tests"""
+import threading
+
+from rb_concurrent import ConcurrentRBTree, ReadWriteLock
+
+
+def test_queued_writes_apply_on_flush():
+    """ Test that queued operations become visible only after flush """
+    tree = ConcurrentRBTree()
+    tree.insert(5)
+    tree.queue_insert(1)
+    tree.queue_insert(9)
+    tree.queue_delete(5)
+    assert list(tree) == [5]
+    assert tree.flush() == 3
+    assert list(tree) == [1, 9]
+    assert tree.flush() == 0
+    assert 9 in tree and 5 not in tree
+    assert len(tree) == 2
+
+def test_batch_size_flushes_automatically():
+    """ Test the automatic flush once the queue reaches the batch size """
+    tree = ConcurrentRBTree(batch_size=3)
+    tree.queue_insert(1)
+    tree.queue_insert(2)
+    assert len(tree) == 0
+    tree.queue_insert(3)
+    assert list(tree.irange(2, 3)) == [2, 3]
+
+def test_readers_share_the_lock():
+    """ Test that two readers can hold the lock at once while a writer waits """
+    lock = ReadWriteLock()
+    both_reading = threading.Barrier(2, timeout=5)
+    written = []
+
+    errors = []
+
+    def __reader():
+        with lock.reading():
+            try:
+                both_reading.wait()
+            except threading.BrokenBarrierError as error:
+                errors.append(error)
+
+    def __writer():
+        with lock.writing():
+            written.append(True)
+
+    readers = [threading.Thread(target=__reader) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    writer = threading.Thread(target=__writer)
+    writer.start()
+    for thread in readers + [writer]:
+        thread.join(timeout=5)
+    assert not errors, "The readers did not hold the lock together"
+    assert written == [True]
+
+def test_reading_while_iterating():
+    """ Test that reads inside a loop do not deadlock with a waiting writer """
+    tree = ConcurrentRBTree()
+    for value in range(0, 20, 2):
+        tree.insert(value)
+    found = []
+
+    def __loop():
+        for value in tree.irange(0, 10):
+            if not found:
+                writer = threading.Thread(target=tree.insert, args=(1,))
+                writer.start()
+                writer.join(timeout=5)
+            found.append((value + 1) in tree)
+
+    looping = threading.Thread(target=__loop, daemon=True)
+    looping.start()
+    looping.join(timeout=5)
+    assert not looping.is_alive(), "Iteration deadlocked with the writer"
+    assert found == [True, False, False, False, False, False]
+
+def test_concurrent_writers_and_readers():
+    """ Test that concurrent writers and readers leave a valid tree """
+    tree = ConcurrentRBTree(batch_size=16)
+
+    def __writer(offset):
+        for value in range(offset, 2000, 4):
+            if value % 3:
+                tree.insert(value)
+            else:
+                tree.queue_insert(value)
+
+    unsorted = []
+
+    def __reader():
+        for _ in range(50):
+            values = list(tree)
+            if values != sorted(values):
+                unsorted.append(values)
+
+    threads = [threading.Thread(target=__writer, args=(i,)) for i in range(4)]
+    threads += [threading.Thread(target=__reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    tree.flush()
+    assert not unsorted, "A reader saw unsorted values"
+    assert list(tree) == list(range(2000))
+    assert tree.tree.is_valid() is True
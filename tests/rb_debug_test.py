@@ -0,0 +1,57 @@
+""" Red Black Tree Invariant Checking Unit Tests"""
+import random
+
+import pytest
+
+from rb_debug import CheckedRBTree, InvariantError, check_path, validate_sample
+from rb_tree import RBTree
+
+
+def test_checked_operations():
+    """ Test that correct inserts and deletes pass the local checks """
+    generator = random.Random(5)
+    tree = CheckedRBTree()
+    values = generator.sample(range(5_000), 1_000)
+    for value in values:
+        tree.insert(value)
+    generator.shuffle(values)
+    for value in values[:700]:
+        tree.delete(value)
+    assert tree.is_valid() is True
+    assert len(tree) == 300
+
+def test_checked_insert_reports_corruption():
+    """ Test that a corrupted node on the repair path is reported """
+    tree = CheckedRBTree()
+    for value in range(1, 16):
+        tree.insert(value)
+    node = tree.search(14)
+    node.size += 1
+    with pytest.raises(InvariantError) as error:
+        tree.insert(16)
+    assert error.value.node is node
+    assert error.value.path == [4, 8, 12, 14]
+    assert "size" in str(error.value)
+
+def test_check_path_black_height():
+    """ Test that unequal black heights are reported """
+    tree = RBTree.from_sorted(range(15))
+    check_path(tree, tree.search(0))
+    tree.search(13).red = True
+    with pytest.raises(InvariantError) as error:
+        check_path(tree, tree.search(14))
+    assert error.value.node.value == 11
+    assert error.value.path == [7, 11]
+
+def test_validate_sample():
+    """ Test the sampled validator on a valid and a corrupted tree """
+    tree = RBTree.from_sorted(range(1_000))
+    assert validate_sample(tree, budget=0.01, generator=random.Random(1)) >= 1
+
+    node = tree.select(500)
+    node.value = -1
+    with pytest.raises(InvariantError) as error:
+        validate_sample(tree, budget=10, generator=random.Random(1))
+    assert error.value.node is node
+    assert error.value.path[-1] == -1
+    assert error.value.path[0] == tree.root.value
@@ -0,0 +1,59 @@
+""" Instrumented Red Black Tree Unit Tests"""
+import random
+
+from rb_instrumented import COUNTERS, InstrumentedRBTree
+from rb_tree import RBTree
+
+
+def test_same_tree_as_plain():
+    """ Test that instrumentation does not change the shape of the tree """
+    values = random.Random(3).sample(range(10_000), 2_000)
+    plain, instrumented = RBTree(), InstrumentedRBTree()
+    for value in values:
+        plain.insert(value)
+        instrumented.insert(value)
+    for value in values[::3]:
+        plain.delete(value)
+        instrumented.delete(value)
+    assert instrumented.is_valid() is True
+
+    def __shape(node):
+        return node and (node.value, node.red, __shape(node.left), __shape(node.right))
+    assert __shape(instrumented.root) == __shape(plain.root)
+
+def test_counters():
+    """ Test the counters on a small, predictable tree """
+    tree = InstrumentedRBTree()
+    for value in [1, 2, 3]:
+        tree.insert(value)
+    stats = tree.stats()
+    # 2 compared with 1, then 3 with 1 and with 2, two tests per visited node
+    assert stats['comparisons'] == 6
+    assert stats['rotations'] == 1, "Ascending inserts should rotate once at 3"
+    assert stats['fix_insert_iterations'] == 1
+    assert stats['operations'] == {'insert': 3}
+    assert sum(stats['histograms']['insert'].values()) == 3
+
+    tree.search(3)
+    # Equality and ordering test at 2, equality test at 3
+    assert tree.stats()['comparisons'] == 9
+    tree.insert(2)
+    assert tree.stats()['comparisons'] == 10, "A duplicate stops at the first equality"
+
+    tree.reset_stats()
+    stats = tree.stats()
+    assert all(stats[name] == 0 for name in COUNTERS)
+    assert stats['operations'] == {} and stats['histograms'] == {}
+
+def test_snapshot_is_detached():
+    """ Test that a snapshot does not change with later operations """
+    tree = InstrumentedRBTree()
+    for value in range(100):
+        tree.insert(value)
+    stats = tree.stats()
+    for value in range(100):
+        tree.delete(value)
+    assert stats['operations'] == {'insert': 100}
+    assert tree.stats()['fix_delete_iterations'] > 0
+    assert tree.stats()['rotations'] > stats['rotations']
+    assert len(tree) == 0
@@ -0,0 +1,62 @@
+""" Interval Tree Unit Tests"""
+import random
+
+import pytest
+
+from rb_interval import IntervalTree
+
+
+def random_intervals(count, seed):
+    """ Generate random intervals """
+    generator = random.Random(seed)
+    intervals = set()
+    while len(intervals) < count:
+        start = generator.randrange(10_000)
+        intervals.add((start, start + generator.randrange(200)))
+    return list(intervals)
+
+def test_overlapping_and_stab():
+    """ Test overlap queries against a scan of every interval """
+    intervals = random_intervals(2_000, 1)
+    tree = IntervalTree()
+    for interval in intervals:
+        tree.insert(interval)
+    assert tree.is_valid() is True
+    generator = random.Random(2)
+    for _ in range(200):
+        low = generator.randrange(-100, 10_300)
+        high = low + generator.randrange(300)
+        expected = sorted(i for i in intervals if i[0] <= high and i[1] >= low)
+        assert list(tree.overlapping(low, high)) == expected
+        assert list(tree.stab(low)) == sorted(i for i in intervals if i[0] <= low <= i[1])
+
+def test_high_after_deletes():
+    """ Test that the greatest ends stay correct through deletions and rotations """
+    intervals = random_intervals(1_000, 3)
+    tree = IntervalTree()
+    for interval in intervals:
+        tree.insert(interval)
+    random.Random(4).shuffle(intervals)
+    for interval in intervals[:600]:
+        tree.delete(interval)
+        assert tree.root is None or tree.root.high == max(i[1] for i in tree)
+    assert tree.is_valid() is True
+    remaining = intervals[600:]
+    assert list(tree.stab(5_000)) == sorted(i for i in remaining if i[0] <= 5_000 <= i[1])
+
+def test_bulk_operations():
+    """ Test building, splitting and joining interval trees """
+    intervals = sorted(random_intervals(500, 5))
+    tree = IntervalTree.from_sorted(intervals)
+    assert tree.is_valid() is True
+    _, right = tree.split(intervals[250])
+    assert tree.is_valid() is True and right.is_valid() is True
+    tree.join(right)
+    tree.delete_range(intervals[100], intervals[200])
+    assert tree.is_valid() is True
+    assert len(tree) == 399
+
+def test_rejects_reversed_interval():
+    """ Test that an interval ending before it starts is rejected """
+    with pytest.raises(ValueError):
+        IntervalTree().insert((5, 1))
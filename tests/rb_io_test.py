@@ -0,0 +1,68 @@
+""" Red Black Tree Serialization Unit Tests"""
+import pytest
+
+from rb_io import MappedTree, dump, load
+from rb_map import RBMap
+from rb_tree import RBTree
+
+
+def test_dump_and_load_numeric(tmp_path):
+    """ Test saving and loading trees with int and float keys """
+    for values in ([20, 15, 10, 25, 30, 5, 35, 1, -2 ** 63], [2.5, -1.0, 1e300]):
+        path = tmp_path / "tree.rbt"
+        RBTree.from_iterable(values).dump(path)
+        tree = RBTree.load(path)
+        assert tree.is_valid() is True, "Loaded tree is invalid"
+        assert list(tree) == sorted(values)
+    assert path.stat().st_size == 16 + 3 * 8, "Floats should be stored as a raw array"
+
+def test_dump_and_load_pickled(tmp_path):
+    """ Test the pickle fallback for other key types and for an empty tree """
+    path = tmp_path / "tree.rbt"
+    for values in (["pear", "fig", "apple"], [(1, "a"), (0, "b")], [2 ** 70, 1], []):
+        dump(RBTree.from_iterable(values), path)
+        assert list(load(path)) == sorted(values)
+
+def test_load_rejects_other_files(tmp_path):
+    """ Test that files not written by dump are refused """
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"definitely not a tree file")
+    with pytest.raises(ValueError):
+        load(path)
+
+def test_dump_refuses_maps(tmp_path):
+    """ Test that trees whose nodes hold more than values are not silently truncated """
+    path = tmp_path / "map.rbt"
+    tree_map = RBMap()
+    tree_map[1] = "a"
+    with pytest.raises(TypeError):
+        tree_map.dump(path)
+    assert not path.exists()
+    dump(RBTree.from_iterable([1]), path)
+    with pytest.raises(TypeError):
+        RBMap.load(path)
+
+def test_mapped_tree(tmp_path):
+    """ Test queries answered from the memory-mapped file """
+    path = tmp_path / "tree.rbt"
+    dump(RBTree.from_sorted(range(0, 100, 5)), path)
+    with MappedTree(path) as mapped:
+        assert len(mapped) == 20
+        assert mapped.search(15) == 3
+        assert mapped.search(16) is None
+        assert 95 in mapped and 100 not in mapped
+        assert mapped.minimum() == 0 and mapped.maximum() == 95
+        assert list(mapped.irange(10, 30)) == [10, 15, 20, 25, 30]
+        assert list(mapped.irange(10, 30, inclusive=(False, False))) == [15, 20, 25]
+        assert list(mapped.irange(high=7)) == [0, 5]
+        assert list(mapped) == list(range(0, 100, 5))
+
+def test_mapped_tree_limits(tmp_path):
+    """ Test mapping an empty file and refusing pickled keys """
+    path = tmp_path / "tree.rbt"
+    dump(RBTree(), path)
+    with MappedTree(path) as mapped:
+        assert len(mapped) == 0 and mapped.minimum() is None
+    dump(RBTree.from_iterable(["a", "b"]), path)
+    with pytest.raises(ValueError):
+        MappedTree(path)
@@ -0,0 +1,96 @@
+""" Red Black Tree Map Unit Tests"""
+import pytest
+
+from rb_map import RBMap
+from rb_tree import TreeObserver
+
+
+def set_up():
+    """ Set up a new map before each test """
+    tree_map = RBMap()
+    for key in [20, 15, 10, 25, 30, 5, 35, 1]:
+        tree_map[key] = str(key)
+    return tree_map
+
+def test_set_and_get():
+    """ Test setting, replacing and reading items """
+    tree_map = set_up()
+    assert tree_map.is_valid() is True, "Map is invalid after setup"
+    assert len(tree_map) == 8
+    assert tree_map[10] == "10"
+    tree_map[10] = "ten"
+    assert tree_map[10] == "ten"
+    assert len(tree_map) == 8, "Replacing an item should not add a node"
+    assert tree_map.get(10) == "ten"
+    assert tree_map.get(11) is None
+    assert tree_map.get(11, "missing") == "missing"
+    assert 10 in tree_map and 11 not in tree_map
+    with pytest.raises(KeyError):
+        _ = tree_map[11]
+
+def test_pop_delete_and_setdefault():
+    """ Test removing items and inserting defaults """
+    tree_map = set_up()
+    assert tree_map.pop(15) == "15"
+    assert tree_map.pop(15, None) is None
+    with pytest.raises(KeyError):
+        tree_map.pop(15)
+    del tree_map[20]
+    with pytest.raises(KeyError):
+        del tree_map[20]
+    assert tree_map.setdefault(5, "other") == "5"
+    assert tree_map.setdefault(7, "seven") == "seven"
+    assert tree_map.is_valid() is True, "Map is invalid after modification"
+    assert list(tree_map.items()) == [(1, "1"), (5, "5"), (7, "seven"), (10, "10"),
+                                      (25, "25"), (30, "30"), (35, "35")]
+
+def test_pop_notifies_once():
+    """ Test that pop reports a single event per call """
+    class Recorder(TreeObserver):
+        """ Observer remembering lookups and deletions """
+        def __init__(self):
+            self.events = []
+
+        def on_delete(self, value):
+            self.events.append(("delete", value))
+
+        def on_hit(self, value):
+            self.events.append(("hit", value))
+
+        def on_miss(self, value):
+            self.events.append(("miss", value))
+
+    recorder = Recorder()
+    tree_map = RBMap(observer=recorder)
+    tree_map[1] = "one"
+    recorder.events.clear()
+    assert tree_map.pop(1) == "one"
+    assert tree_map.pop(1, None) is None
+    assert recorder.events == [("delete", 1), ("miss", 1)]
+
+def test_items_survive_deletion_of_neighbours():
+    """ Test that deleting a node with two children keeps other items with their keys """
+    tree_map = RBMap()
+    for key in range(100):
+        tree_map[key] = key * 10
+    for key in range(0, 100, 3):
+        del tree_map[key]
+    assert tree_map.is_valid() is True, "Map is invalid after deletion"
+    assert all(item == key * 10 for key, item in tree_map.items())
+
+def test_key_function():
+    """ Test ordering by a key function evaluated once per operation """
+    calls = []
+
+    def by_length(word):
+        calls.append(word)
+        return len(word)
+
+    tree_map = RBMap(key=by_length)
+    for word in ["pear", "fig", "banana", "kiwi", "apple"]:
+        tree_map[word] = word.upper()
+    assert len(calls) == 5, "The key function should run once per insert"
+    assert list(tree_map) == ["fig", "pear", "apple", "banana"]
+    assert list(reversed(tree_map)) == ["banana", "apple", "pear", "fig"]
+    assert tree_map["kiwi"] == "KIWI", "Keys ordered equally should share an entry"
+    assert list(tree_map.values()) == ["FIG", "KIWI", "APPLE", "BANANA"]
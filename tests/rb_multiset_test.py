@@ -0,0 +1,83 @@
+""" Red Black Tree Multiset Unit Tests"""
+import random
+from collections import Counter
+
+import pytest
+
+from rb_multiset import RBMultiset
+
+
+def test_counts():
+    """ Test counting repeated inserts and decrementing deletes """
+    multiset = RBMultiset()
+    for value in [5, 3, 5, 8, 5, 3]:
+        multiset.insert(value)
+    assert len(multiset) == 3, "Repeated values should not add nodes"
+    assert multiset.count(5) == 3 and multiset.count(3) == 2 and multiset.count(4) == 0
+    assert multiset.total() == 6
+    assert 8 in multiset and 4 not in multiset
+
+    multiset.delete(5)
+    assert multiset.count(5) == 2 and len(multiset) == 3
+    multiset.delete(8)
+    assert 8 not in multiset and len(multiset) == 2
+    multiset.delete(5, count=None)
+    assert multiset.count(5) == 0 and len(multiset) == 1
+    multiset.insert(3, count=4)
+    assert multiset.count(3) == 6
+    assert multiset.is_valid() is True
+
+def test_repeated_insert_keeps_shape():
+    """ Test that a repeated insert neither allocates nor rebalances """
+    multiset = RBMultiset()
+    for value in range(100):
+        multiset.insert(value)
+    nodes = {value: multiset.search(value) for value in range(100)}
+    root = multiset.root
+    for value in range(100):
+        assert multiset.insert(value) is nodes[value]
+    assert multiset.root is root
+    assert multiset.count(42) == 2
+
+def test_elements_and_items():
+    """ Test iterating with and without expanding duplicates """
+    generator = random.Random(8)
+    values = [generator.randrange(50) for _ in range(1_000)]
+    multiset = RBMultiset()
+    node = None
+    for value in values:
+        node = multiset.insert(value, hint=node)
+    counter = Counter(values)
+    assert list(multiset) == sorted(counter)
+    assert list(multiset.items()) == sorted(counter.items())
+    assert list(multiset.elements()) == sorted(values)
+    assert multiset.copy().count(values[0]) == counter[values[0]]
+    assert multiset.is_valid() is True
+
+def test_invalid_counts():
+    """ Test that counts below 1 are rejected without changing the multiset """
+    multiset = RBMultiset()
+    multiset.insert(2, count=3)
+    for count in (0, -1):
+        with pytest.raises(ValueError):
+            multiset.insert(1, count=count)
+        with pytest.raises(ValueError):
+            multiset.delete(2, count=count)
+    assert 1 not in multiset and len(multiset) == 1
+    assert multiset.count(2) == 3
+    multiset.delete(2, count=None)
+    assert len(multiset) == 0
+
+def test_bulk_construction_and_update_keep_counts(tmp_path):
+    """ Test that counts survive from_iterable and update, and that dump refuses them """
+    multiset = RBMultiset.from_iterable([2, 1, 1, 1])
+    assert multiset.is_valid() is True
+    assert list(multiset.items()) == [(1, 3), (2, 1)]
+    multiset.update([1, 1, 3])
+    assert list(multiset.items()) == [(1, 5), (2, 1), (3, 1)]
+    multiset.update(RBMultiset.from_iterable([3, 4, 4]))
+    multiset |= multiset
+    assert list(multiset.items()) == [(1, 10), (2, 2), (3, 4), (4, 4)]
+    assert multiset.is_valid() is True
+    with pytest.raises(TypeError):
+        multiset.dump(tmp_path / "multiset.rbt")
@@ -0,0 +1,51 @@
+""" Persistent Red Black Tree Unit Tests"""
+import random
+
+from rb_persistent import PersistentRBTree
+
+
+def test_insert_returns_new_version():
+    """ Test that insert leaves the previous version unchanged """
+    empty = PersistentRBTree()
+    first = empty.insert(20).insert(15).insert(10)
+    second = first.insert(25)
+    assert list(empty) == []
+    assert list(first) == [10, 15, 20]
+    assert list(second) == [10, 15, 20, 25]
+    assert first.insert(15) is first, "Inserting a duplicate should not copy anything"
+    assert first.snapshot() is first
+    assert first.is_valid() is True and second.is_valid() is True
+
+def test_delete_returns_new_version():
+    """ Test that delete leaves the previous version unchanged """
+    tree = PersistentRBTree()
+    for value in range(20):
+        tree = tree.insert(value)
+    smaller = tree.delete(7).delete(0).delete(19)
+    assert list(tree) == list(range(20))
+    assert list(smaller) == [v for v in range(20) if v not in (0, 7, 19)]
+    assert tree.delete(100) is tree
+    assert smaller.is_valid() is True
+    assert len(smaller) == 17
+    assert 7 in tree and 7 not in smaller
+    assert smaller.minimum().value == 1 and smaller.maximum().value == 18
+
+def test_all_versions_stay_valid():
+    """ Test random operations against every earlier version """
+    generator = random.Random(11)
+    tree = PersistentRBTree()
+    reference = set()
+    versions = [(tree, [])]
+    for _ in range(1500):
+        value = generator.randrange(200)
+        if generator.random() < 0.55:
+            tree = tree.insert(value)
+            reference.add(value)
+        else:
+            tree = tree.delete(value)
+            reference.discard(value)
+        versions.append((tree, sorted(reference)))
+    for version, expected in versions:
+        assert version.is_valid() is True, "A version of the tree is invalid"
+        assert list(version) == expected
+        assert len(version) == len(expected)
@@ -0,0 +1,81 @@
+""" Sharded Red Black Tree Unit Tests"""
+import random
+
+from rb_sharded import ShardedRBTree
+
+
+def test_growth_and_rebalancing():
+    """ Test that shards are split as the container grows and stay balanced """
+    container = ShardedRBTree(shards=4, min_shard_size=50)
+    for value in range(2_000):
+        container.insert(value)
+    assert container.is_valid() is True
+    assert len(container.sizes) == 4
+    assert max(container.sizes) <= 2 * 2_000 / 4 + 1
+    assert list(container) == list(range(2_000))
+    for value in range(0, 2_000, 3):
+        container.delete(value)
+    assert 3 not in container and 4 in container
+    assert list(container.irange(10, 20)) == [10, 11, 13, 14, 16, 17, 19, 20]
+
+def check_bulk_operations(container, values, generator):
+    """ Check bulk searches, inserts, deletes and range counts against a set """
+    present = set(values)
+    queries = [generator.randrange(100_000) for _ in range(1_000)]
+    assert container.search_many(queries) == [q in present for q in queries]
+
+    extra = [generator.randrange(200_000) for _ in range(3_000)]
+    container.insert_many(extra)
+    present.update(extra)
+    removed = generator.sample(sorted(present), 500)
+    container.delete_many(removed)
+    present.difference_update(removed)
+    assert container.is_valid() is True
+    assert len(container) == len(present)
+    assert list(container) == sorted(present)
+
+    ranges = [(low, low + generator.randrange(30_000))
+              for low in (generator.randrange(200_000) for _ in range(50))]
+    expected = [sum(1 for v in present if low <= v <= high) for low, high in ranges]
+    assert container.count_ranges(ranges) == expected
+    assert [container.count_range(low, high) for low, high in ranges] == expected
+    assert container.count_range(10, 5) == 0
+
+def test_bulk_operations():
+    """ Test bulk operations on shards kept in this process """
+    generator = random.Random(11)
+    values = generator.sample(range(100_000), 5_000)
+    container = ShardedRBTree.from_iterable(values, shards=8, min_shard_size=100)
+    check_bulk_operations(container, values, generator)
+
+def test_worker_processes():
+    """ Test bulk operations and rebalancing on shards kept in worker processes """
+    generator = random.Random(13)
+    values = generator.sample(range(100_000), 5_000)
+    with ShardedRBTree.from_iterable(values, shards=6, processes=2,
+                                     min_shard_size=100) as container:
+        check_bulk_operations(container, values, generator)
+        container.insert_many(range(200_000, 230_000))
+        assert container.is_valid() is True
+        assert len(container.sizes) == 6
+        container.insert(-1)
+        assert -1 in container and container.search_many([-1, -2]) == [True, False]
+
+    with ShardedRBTree(shards=4, processes=3, min_shard_size=10) as container:
+        container.insert_many(range(0, 1_000, 2))
+        container.insert_many(range(1, 1_000, 2))
+        assert container.is_valid() is True and list(container) == list(range(1_000))
+        assert container.count_ranges([(0, 99), (500, 2_000)]) == [100, 500]
+
+def test_rebalancing_with_small_ratio():
+    """ Test that rebalancing settles when a joined pair would exceed the limit """
+    generator = random.Random(5)
+    for max_ratio in (1.5, 1.3, 1.1):
+        for _ in range(20):
+            values = generator.sample(range(100_000), 2_000)
+            container = ShardedRBTree.from_iterable(values, shards=8, max_ratio=max_ratio,
+                                                    min_shard_size=5)
+            batch = [generator.randrange(100_000) for _ in range(generator.randrange(2_000))]
+            container.insert_many(batch)
+            assert container.is_valid() is True
+            assert len(container) == len(set(values) | set(batch))
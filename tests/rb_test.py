@@ -1,5 +1,12 @@
 """ Red Black Tree Unit Tests"""
-from rb_tree import RBTree
+import io
+import logging
+import random
+import sys
+
+import pytest
+
+from rb_tree import Cursor, Node, RBTree, TreeObserver, LoggingObserver
 
 
 def set_up():
@@ -190,3 +197,421 @@ def test_clear():
     assert tree.is_valid() is True, "Tree is invalid after clear"
     assert tree.root is None, "Tree should be empty after clear"
     assert tree.count_nodes() == 0, "Tree should have 0 nodes after clear"
+
+def test_silent_by_default(capsys):
+    """ Test that tree operations do not write to stdout """
+    tree = set_up()
+    tree.search(10)
+    tree.search(100)
+    tree.delete(10)
+    tree.delete(100)
+    tree.clear()
+    captured = capsys.readouterr()
+    assert captured.out == "", f"Unexpected output: {captured.out}"
+
+def test_observer():
+    """ Test that the observer receives insert, delete, hit and miss events """
+    class Recorder(TreeObserver):
+        """ Observer remembering every event """
+        def __init__(self):
+            self.events = []
+
+        def on_insert(self, value):
+            self.events.append(("insert", value))
+
+        def on_delete(self, value):
+            self.events.append(("delete", value))
+
+        def on_hit(self, value):
+            self.events.append(("hit", value))
+
+        def on_miss(self, value):
+            self.events.append(("miss", value))
+
+    recorder = Recorder()
+    tree = RBTree(observer=recorder)
+    add_values(tree, [3, 1, 3])
+    tree.search(1)
+    tree.search(7)
+    tree.delete(3)
+    tree.delete(8)
+    tree.clear()
+    assert recorder.events == [("insert", 3), ("insert", 1), ("hit", 1), ("miss", 7),
+                               ("delete", 3), ("miss", 8)]
+
+def test_logging_observer(caplog):
+    """ Test that the logging adapter forwards events to the logging module """
+    tree = RBTree(observer=LoggingObserver())
+    with caplog.at_level(logging.INFO, logger="rb_tree"):
+        tree.insert(5)
+        tree.search(5)
+        tree.delete(6)
+        tree.clear()
+    assert caplog.messages == ["Inserted 5 into the tree.", "Value 5 found in the tree.",
+                               "Value 6 not found in the tree.", "Tree cleared."]
+
+def test_from_sorted():
+    """ Test bulk construction from sorted values """
+    for size in range(0, 70):
+        tree = RBTree.from_sorted(range(size))
+        assert tree.is_valid() is True, f"Tree of size {size} is invalid"
+        assert tree.count_nodes() == size
+        if size:
+            assert tree.minimum().value == 0
+            assert tree.maximum().value == size - 1
+    tree = RBTree.from_sorted([1, 2, 3])
+    tree.insert(4)
+    tree.delete(1)
+    assert tree.is_valid() is True, "Tree is invalid after modification"
+
+def test_from_sorted_rejects_unsorted():
+    """ Test that from_sorted refuses values which are not strictly ascending """
+    for values in ([2, 1], [1, 1]):
+        with pytest.raises(ValueError):
+            RBTree.from_sorted(values)
+
+def test_from_iterable(capsys):
+    """ Test bulk construction from unsorted values with duplicates """
+    tree = RBTree.from_iterable([5, 3, 9, 3, 1, 9, 7])
+    assert tree.is_valid() is True, "Tree is invalid after construction"
+    _ = capsys.readouterr() # Clear output
+    tree.inorder()
+    assert capsys.readouterr().out == "1 3 5 7 9 \n"
+
+def check_sizes(node):
+    """ Recursively verify the subtree size stored in every node, return the real size """
+    if node is None:
+        return 0
+    size = 1 + check_sizes(node.left) + check_sizes(node.right)
+    assert node.size == size, f"Node {node.value} has size {node.size}, expected {size}"
+    return size
+
+def test_len_rank_and_select():
+    """ Test the subtree sizes and the len, rank and select methods """
+    tree = set_up()
+    assert len(tree) == 8
+    assert [tree.select(i).value for i in range(8)] == [1, 5, 10, 15, 20, 25, 30, 35]
+    assert tree.select(-1).value == 35
+    assert tree.rank(1) == 0
+    assert tree.rank(20) == 4
+    assert tree.rank(21) == 5
+    assert tree.rank(1000) == 8
+    with pytest.raises(IndexError):
+        tree.select(8)
+    assert len(RBTree()) == 0
+
+    generator = random.Random(42)
+    values = list(range(300))
+    generator.shuffle(values)
+    tree = RBTree()
+    add_values(tree, values)
+    check_sizes(tree.root)
+    generator.shuffle(values)
+    for value in values[:200]:
+        tree.delete(value)
+        check_sizes(tree.root)
+    remaining = sorted(values[200:])
+    assert len(tree) == 100
+    assert [tree.select(i).value for i in range(100)] == remaining
+    assert [tree.rank(value) for value in remaining] == list(range(100))
+    check_sizes(RBTree.from_sorted(range(50)).root)
+
+def test_iteration():
+    """ Test the ascending and descending iterators """
+    tree = set_up()
+    assert list(tree) == [1, 5, 10, 15, 20, 25, 30, 35]
+    assert list(reversed(tree)) == [35, 30, 25, 20, 15, 10, 5, 1]
+    assert not list(RBTree())
+    assert not list(reversed(RBTree()))
+
+def test_irange():
+    """ Test lazy range queries with inclusive and exclusive bounds """
+    tree = set_up()
+    assert list(tree.irange(10, 25)) == [10, 15, 20, 25]
+    assert list(tree.irange(10, 25, inclusive=(False, False))) == [15, 20]
+    assert list(tree.irange(11, 24)) == [15, 20]
+    assert list(tree.irange(high=10, inclusive=(True, False))) == [1, 5]
+    assert list(tree.irange(low=30)) == [30, 35]
+    assert list(tree.irange()) == list(tree)
+    assert not list(tree.irange(36, 100))
+    assert not list(tree.irange(20, 10))
+    assert not list(RBTree().irange(1, 2))
+
+def test_node_color():
+    """ Test the compact color flag and its string view """
+    node = Node(1)
+    assert node.red is True
+    assert node.color == "red"
+    node.color = "black"
+    assert node.red is False
+    assert node.color == "black"
+    assert Node(2, "black").red is False
+    assert not hasattr(node, "__dict__"), "Node should not carry a per-instance dict"
+
+def random_tree(generator, size, limit):
+    """ Build a tree of random values together with the set of these values """
+    values = {generator.randrange(limit) for _ in range(size)}
+    tree = RBTree()
+    add_values(tree, generator.sample(sorted(values), len(values)))
+    return tree, values
+
+def test_set_operations():
+    """ Test union, intersection, difference and symmetric difference against sets """
+    generator = random.Random(3)
+    for _ in range(60):
+        first, first_values = random_tree(generator, generator.randrange(60), 100)
+        second, second_values = random_tree(generator, generator.randrange(60), 100)
+        for result, expected in ((first | second, first_values | second_values),
+                                 (first & second, first_values & second_values),
+                                 (first - second, first_values - second_values),
+                                 (first ^ second, first_values ^ second_values)):
+            assert result.is_valid() is True, "Result of a set operation is invalid"
+            check_sizes(result.root)
+            assert list(result) == sorted(expected)
+        assert list(first) == sorted(first_values), "Operands should not change"
+        assert list(second) == sorted(second_values), "Operands should not change"
+
+def test_in_place_set_operations():
+    """ Test that in-place set operations keep the nodes of the updated tree """
+    tree = RBTree.from_sorted(range(0, 40, 2))
+    nodes = {value: tree.search(value) for value in tree}
+    tree |= RBTree.from_sorted(range(0, 40, 3))
+    assert tree.is_valid() is True, "Tree is invalid after update"
+    assert all(tree.search(value) is node for value, node in nodes.items())
+    tree &= RBTree.from_sorted(range(10, 30))
+    assert list(tree) == [10, 12, 14, 15, 16, 18, 20, 21, 22, 24, 26, 27, 28]
+    assert all(tree.search(value) is nodes[value] for value in tree if value in nodes)
+    tree -= RBTree.from_sorted([12, 15, 100])
+    tree ^= RBTree.from_sorted([10, 11])
+    assert tree.is_valid() is True, "Tree is invalid after in-place operations"
+    check_sizes(tree.root)
+    assert list(tree) == [11, 14, 16, 18, 20, 21, 22, 24, 26, 27, 28]
+    assert list(tree.union([1, 50])) == [1] + list(tree) + [50]
+    tree ^= tree
+    assert len(tree) == 0
+
+def test_split_and_join():
+    """ Test splitting a tree by a value and joining the parts back """
+    for size in (0, 1, 2, 7, 50, 129):
+        for value in (-1, 0, size // 3, size // 2 + 0.5, size - 1, size):
+            tree = RBTree.from_iterable(random.Random(size).sample(range(size), size))
+            left, right = tree.split(value)
+            assert left is tree
+            for part in (left, right):
+                assert part.is_valid() is True, f"Part of split({value}) is invalid"
+                check_sizes(part.root)
+            assert list(left) == [v for v in range(size) if v < value]
+            assert list(right) == [v for v in range(size) if v >= value]
+            RBTree.join(left, right)
+            assert left.is_valid() is True, "Tree is invalid after join"
+            check_sizes(left.root)
+            assert list(left) == list(range(size))
+            assert len(right) == 0
+
+def test_join_overlapping():
+    """ Test that joining trees with overlapping values is refused """
+    with pytest.raises(ValueError):
+        RBTree.from_sorted([1, 5]).join(RBTree.from_sorted([3, 9]))
+    tree = RBTree.from_sorted([1, 2])
+    tree.join(RBTree())
+    assert list(tree) == [1, 2]
+    empty = RBTree()
+    empty.join(tree)
+    assert list(empty) == [1, 2] and len(tree) == 0
+
+def test_delete_range():
+    """ Test deleting ranges of values with inclusive and exclusive bounds """
+    cases = [((10, 20), (True, True), [v for v in range(50) if not 10 <= v <= 20]),
+             ((10, 20), (False, False), [v for v in range(50) if not 10 < v < 20]),
+             ((None, 25), (True, False), list(range(25, 50))),
+             ((40, None), (True, True), list(range(40))),
+             ((None, None), (True, True), []),
+             ((60, 70), (True, True), list(range(50)))]
+    for (low, high), inclusive, expected in cases:
+        tree = RBTree.from_iterable(range(50))
+        assert tree.delete_range(low, high, inclusive) == 50 - len(expected)
+        assert tree.is_valid() is True, f"Tree is invalid after delete_range({low}, {high})"
+        check_sizes(tree.root)
+        assert list(tree) == expected
+
+def test_insert_with_hint():
+    """ Test hinted insertion of nearly sorted and random values """
+    generator = random.Random(5)
+    values = list(range(500))
+    for i in range(0, 490, 7):
+        values[i], values[i + 3] = values[i + 3], values[i]
+    values += [generator.randrange(-100, 600) for _ in range(200)]
+    tree = RBTree()
+    node = None
+    for value in values:
+        node = tree.insert(value, hint=node)
+        assert node.value == value
+    assert tree.is_valid() is True, "Tree is invalid after hinted inserts"
+    check_sizes(tree.root)
+    assert list(tree) == sorted(set(values))
+    hint = tree.search(250)
+    assert tree.insert(250.5, hint=hint).value == 250.5
+    assert tree.insert(-1000, hint=hint) is tree.minimum()
+    assert tree.insert(10 ** 6, hint=hint) is tree.maximum()
+    assert tree.insert(300, hint=hint) is tree.search(300), "Duplicates should be found"
+    assert tree.is_valid() is True, "Tree is invalid after hinted inserts"
+
+def test_hinted_append_compares_little():
+    """ Test that appending in order with hints needs O(1) comparisons per value """
+    class Key(int):
+        """ Integer counting its comparisons """
+        comparisons = 0
+
+        def __lt__(self, other):
+            Key.comparisons += 1
+            return int(self) < int(other)
+
+        def __eq__(self, other):
+            Key.comparisons += 1
+            return int(self) == int(other)
+
+        __hash__ = int.__hash__
+
+    tree = RBTree()
+    node = None
+    for value in range(2000):
+        node = tree.insert(Key(value), hint=node)
+    assert Key.comparisons < 10 * 2000, f"Too many comparisons: {Key.comparisons}"
+    assert tree.is_valid() is True
+
+def test_write_dot():
+    """ Test writing the tree as DOT text, whole and in parts """
+    tree = RBTree.from_sorted(range(15))
+    out = io.StringIO()
+    tree.write_dot(out)
+    dot = out.getvalue()
+    assert dot.startswith("digraph") and dot.endswith("}\n")
+    assert dot.count("label=") == 15 and dot.count("->") == 14
+    assert dot.count("fillcolor=black") == 15, "A full tree should be all black"
+
+    out = io.StringIO()
+    tree.write_dot(out, max_depth=1)
+    dot = out.getvalue()
+    assert dot.count("fillcolor=gray") == 4, "Hidden subtrees should become boxes"
+    assert dot.count('label="3" shape=box') == 4
+
+    out = io.StringIO()
+    tree.write_dot(out, node=tree.search(3), low=2, high=4)
+    dot = out.getvalue()
+    assert [line.split('"')[1] for line in dot.splitlines() if "label=" in line] \
+        == ["3", "2", "4"]
+
+def test_write_dot_depth_within_range():
+    """ Test that the depth limit counts written nodes only and boxes omit sizes """
+    tree = RBTree.from_sorted(range(15))
+    out = io.StringIO()
+    tree.write_dot(out, max_depth=1, low=12)
+    labels = [line.split('"')[1] for line in out.getvalue().splitlines() if "label=" in line]
+    assert labels == ["13", "12", "14"]
+
+    out = io.StringIO()
+    tree.write_dot(out, max_depth=0, low=5, high=9)
+    dot = out.getvalue()
+    assert 'label="7" fillcolor' in dot
+    assert dot.count('label="..." shape=box') == 2 and dot.count("->") == 2
+
+def test_write_dot_to_file(tmp_path):
+    """ Test writing DOT text to a path """
+    tree = RBTree()
+    tree.insert('say "hi"')
+    tree.write_dot(tmp_path / "tree.gv")
+    assert r'label="say \"hi\""' in (tmp_path / "tree.gv").read_text(encoding="utf-8")
+
+def test_visualize_without_graphviz(monkeypatch):
+    """ Test that graphviz is needed only by visualize """
+    monkeypatch.setitem(sys.modules, "graphviz", None)
+    tree = set_up()
+    assert tree.is_valid() is True
+    with pytest.raises(ImportError):
+        tree.visualize()
+
+def test_floor_ceiling_lower_higher():
+    """ Test the neighbour queries against a sorted list """
+    tree = RBTree.from_iterable(range(0, 100, 5))
+    assert tree.floor(12).value == 10 and tree.floor(10).value == 10
+    assert tree.ceiling(12).value == 15 and tree.ceiling(10).value == 10
+    assert tree.lower(10).value == 5 and tree.higher(10).value == 15
+    assert tree.floor(-1) is None and tree.lower(0) is None
+    assert tree.ceiling(96) is None and tree.higher(95) is None
+    assert RBTree().floor(1) is None
+    values = list(tree)
+    for value in range(-3, 103):
+        lower = tree.lower(value)
+        assert (lower.value if lower else None) == \
+            max((v for v in values if v < value), default=None)
+        higher = tree.higher(value)
+        assert (higher.value if higher else None) == \
+            min((v for v in values if v > value), default=None)
+
+def test_nearest():
+    """ Test finding the closest values """
+    tree = RBTree.from_iterable([1, 4, 6, 10, 20])
+    assert [node.value for node in tree.nearest(5)] == [4]
+    assert [node.value for node in tree.nearest(5, k=3)] == [4, 6, 1]
+    assert [node.value for node in tree.nearest(10, k=2)] == [10, 6]
+    assert [node.value for node in tree.nearest(100, k=10)] == [20, 10, 6, 4, 1]
+    assert RBTree().nearest(5) == []
+
+def test_cursor_moves():
+    """ Test moving a cursor both ways and past the ends """
+    tree = RBTree.from_iterable(range(0, 50, 10))
+    cursor = tree.cursor_at(15)
+    assert isinstance(cursor, Cursor)
+    assert cursor.value == 20
+    assert [cursor.next(), cursor.next(), cursor.next()] == [30, 40, None]
+    assert cursor.prev() == 40, "Moving back from the end should return to the maximum"
+    assert cursor.seek(-5) == 0
+    assert cursor.prev() is None and cursor.value is None
+    assert cursor.next() == 0
+    assert cursor.seek(45) is None
+    assert cursor.prev() == 40
+    assert RBTree().cursor_at(1).next() is None
+
+def test_cursor_survives_modification():
+    """ Test that a cursor keeps its place while the tree changes around it """
+    generator = random.Random(10)
+    tree = RBTree.from_iterable(range(0, 2_000, 2))
+    cursor = tree.cursor_at(1_000)
+    node = cursor.node
+    for value in generator.sample(range(2_000), 1_500):
+        if value != 1_000:
+            if value % 2:
+                tree.insert(value)
+            else:
+                tree.delete(value)
+    assert cursor.node is node and cursor.value == 1_000
+    assert cursor.next() == tree.higher(1_000).value
+    assert cursor.prev() == 1_000
+
+    tree.delete(1_000)
+    assert cursor.value is None, "The deleted value should not be reported"
+    assert cursor.next() == tree.higher(1_000).value
+    cursor.seek(1_000)
+    tree.delete(cursor.value)
+    assert cursor.prev() == tree.lower(1_000).value
+
+def test_cursor_after_bulk_removal():
+    """ Test that a cursor notices its node leaving with a whole subtree """
+    tree = RBTree.from_sorted(range(100))
+    cursor = tree.cursor_at(37)
+    tree.delete_range(30, 60)
+    assert cursor.value is None, "A value removed by delete_range should not be reported"
+    assert cursor.next() == 61
+    assert cursor.prev() == 29
+
+    assert cursor.seek(37) == 61
+    tree.clear()
+    assert cursor.value is None and cursor.next() is None
+    tree.insert(38)
+    assert cursor.prev() == 38 and cursor.next() is None
+
+    tree = RBTree.from_sorted(range(10))
+    cursor = tree.cursor_at(7)
+    _, right = tree.split(5)
+    assert cursor.value is None, "A node moved to another tree is no longer in this one"
+    assert cursor.prev() == 4 and right.cursor_at(7).value == 7